@@ -0,0 +1,125 @@
+"""
+Shared telemetry loading for the analysis scripts.
+
+The first read of a CSV log writes a sibling `.parquet` file; later runs
+load the typed, columnar copy instead of re-tokenizing the CSV. The cache
+is refreshed whenever the CSV is newer than it.
+
+Scripts that only need per-sample reductions of a very long log can
+stream it with `iter_telemetry_chunks` instead, keeping the working set
+to one chunk.
+
+Measurement columns can be downcast to float32 (`float32=True`) for
+plot-only scripts; time columns always stay float64, since float32 cannot
+resolve UNIX timestamps to better than minutes.
+
+Parquet support and the multi-threaded Arrow CSV parser both need
+`pyarrow`. Without it the loader falls back to the default pandas C parser.
+"""
+
+import os
+from contextlib import suppress
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+CHUNK_ROWS = 200_000
+
+# Never downcast: float32 has ~7 significant digits
+TIME_COLS = frozenset({"t", "unix_time", "mission_t0_unix"})
+
+
+def _parquet_path(csv_path: Path) -> Path:
+    return csv_path.with_suffix(".parquet")
+
+
+def _read_csv(csv_path: Path, columns: Optional[list] = None) -> pd.DataFrame:
+    try:
+        return pd.read_csv(csv_path, usecols=columns, engine="pyarrow")
+    except ImportError:
+        return pd.read_csv(csv_path, usecols=columns)
+
+
+def _to_float32(df: pd.DataFrame) -> pd.DataFrame:
+    downcast = {
+        name: np.float32
+        for name, dtype in df.dtypes.items()
+        if dtype == np.float64 and name not in TIME_COLS
+    }
+    return df.astype(downcast, copy=False) if downcast else df
+
+
+def _load_telemetry(csv_path: Path, cols: Optional[Sequence[str]]) -> pd.DataFrame:
+    pq_path = _parquet_path(csv_path)
+    columns = None if cols is None else list(cols)
+
+    if pq_path.exists() and pq_path.stat().st_mtime >= csv_path.stat().st_mtime:
+        try:
+            return pd.read_parquet(pq_path, columns=columns)
+        except ImportError:
+            return _read_csv(csv_path, columns)
+        except (OSError, ValueError):
+            # Unreadable cache (ArrowInvalid is a ValueError): drop and rebuild
+            with suppress(OSError):
+                pq_path.unlink()
+
+    # Cache the full log so any later column selection can be served from it.
+    # Written to a temp sibling and renamed, so an interrupted write never
+    # leaves a truncated cache that looks up to date.
+    df = _read_csv(csv_path)
+    tmp_path = pq_path.with_suffix(".tmp.parquet")
+    try:
+        df.to_parquet(tmp_path, compression="snappy")
+        os.replace(tmp_path, pq_path)
+    except (ImportError, OSError):
+        with suppress(OSError):
+            tmp_path.unlink()
+
+    return df if columns is None else df[columns]
+
+
+def load_telemetry(
+    csv_path: Path,
+    cols: Optional[Sequence[str]] = None,
+    float32: bool = False,
+) -> pd.DataFrame:
+    """
+    Load a telemetry log, preferring an up-to-date Parquet cache.
+
+    Parameters:
+        csv_path : path to the telemetry CSV
+        cols     : columns to return (all columns if None)
+        float32  : downcast float64 measurement columns (not TIME_COLS)
+    """
+    df = _load_telemetry(Path(csv_path), cols)
+    return _to_float32(df) if float32 else df
+
+
+def load_mission_log(
+    csv_path: Path,
+    cols: Optional[Sequence[str]] = None,
+    float32: bool = False,
+) -> Dict[str, np.ndarray]:
+    """
+    Load a telemetry log as a dict of column name -> NumPy array.
+    """
+    df = load_telemetry(csv_path, cols, float32=float32)
+    return {name: df[name].to_numpy() for name in df.columns}
+
+
+def iter_telemetry_chunks(
+    csv_path: Path,
+    cols: Optional[Sequence[str]] = None,
+    chunksize: int = CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a telemetry CSV as DataFrame chunks of at most `chunksize` rows.
+
+    Bypasses the Parquet cache; the pyarrow engine does not support chunking.
+    """
+    columns = None if cols is None else list(cols)
+    with pd.read_csv(csv_path, usecols=columns, chunksize=chunksize) as reader:
+        yield from reader
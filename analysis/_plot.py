@@ -0,0 +1,17 @@
+"""
+Shared plotting helpers for the analysis scripts.
+"""
+
+# Agg's cost scales with vertex count; a few thousand points per line is
+# visually indistinguishable from the full log at 200 dpi.
+MAX_PLOT_POINTS = 5000
+
+
+def decimate(a, max_pts: int = MAX_PLOT_POINTS):
+    """
+    Stride an array (or pandas Series) down to at most max_pts samples.
+
+    Use for line artists only; take start/end markers from the raw data.
+    """
+    step = max(1, -(-len(a) // max_pts))
+    return a[::step]
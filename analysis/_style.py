@@ -0,0 +1,18 @@
+"""
+Shared, low-overhead Matplotlib rcParams profile for the analysis scripts.
+
+Importing this module applies the profile:
+- `agg.path.chunksize` splits long polylines into chunks for the Agg rasterizer
+- `path.simplify` drops near-collinear vertices before drawing
+- no usetex text pipeline, no automatic layout pass per draw
+"""
+
+import matplotlib as mpl
+
+mpl.rcParams.update({
+    "agg.path.chunksize": 10000,
+    "path.simplify": True,
+    "path.simplify_threshold": 1.0,
+    "figure.autolayout": False,
+    "text.usetex": False,
+})
@@ -1,8 +1,13 @@
-import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
 
+import analysis._style  # noqa: F401
+from analysis._io import load_telemetry
+from analysis._plot import decimate
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 CSV_PATH = REPO_ROOT / "logs" / "circle_position_mission_log.csv"
 
@@ -11,7 +16,7 @@ OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 OUT_PNG = OUT_DIR / "drift_vs_time.png"
 
-df = pd.read_csv(CSV_PATH)
+df = load_telemetry(CSV_PATH, cols=["t", "north_m", "east_m"])
 
 t = df["t"].values
 x = df["north_m"].values
@@ -19,15 +24,16 @@ y = df["east_m"].values
 
 cx = np.mean(x)
 cy = np.mean(y)
-r = np.mean(np.sqrt((x - cx)**2 + (y - cy)**2))
+radii = np.hypot(x - cx, y - cy)
+r = radii.mean()
 
-drift = np.abs(np.sqrt((x - cx)**2 + (y - cy)**2) - r)
+drift = np.abs(radii - r)
 mask = t > 4.0
 t = t[mask] - t[mask][0]
 drift = drift[mask]
 
 plt.figure(figsize=(8, 4))
-plt.plot(t, drift, linewidth=2)
+plt.plot(decimate(t), decimate(drift), linewidth=2)
 plt.grid(True)
 
 plt.xlabel("Time [s]")
@@ -35,4 +41,5 @@ plt.ylabel("Radial Drift [m]")
 plt.title("Radial Drift from Reference Circle")
 
 plt.savefig(OUT_PNG, dpi=200, bbox_inches="tight")
+plt.close()
 print(f"Saved plot → {OUT_PNG}")
@@ -1,8 +1,13 @@
-import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
-import numpy as np
 from pathlib import Path
 
+import analysis._style  # noqa: F401
+from analysis._io import load_telemetry
+from analysis._plot import decimate
+from src.trajectories.circle import CircleTrajectory
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 CSV_PATH = REPO_ROOT / "logs" / "circle_position_mission_log.csv"
 OUT_DIR = REPO_ROOT / "analysis" / "outputs"
@@ -14,7 +19,7 @@ OUT_PNG = OUT_DIR / "circle_xy_actual_vs_reference.png"
 R = 3.0
 OMEGA = 0.3
 
-df = pd.read_csv(CSV_PATH)
+df = load_telemetry(CSV_PATH, cols=["t", "north_m", "east_m"])
 
 t = df["t"].values
 x = df["north_m"].values
@@ -25,13 +30,15 @@ cx = x[0]
 cy = y[0]
 
 # Ideal reference trajectory
-x_ref = cx + R * np.cos(OMEGA * t)
-y_ref = cy + R * np.sin(OMEGA * t)
+trajectory = CircleTrajectory(radius=R, center_x=cx, center_y=cy, omega=OMEGA)
+
+t_ref = t[t <= trajectory.duration()]
+x_ref, y_ref = trajectory.position_xy_array(t_ref)
 
 plt.figure(figsize=(6, 6))
 
-plt.plot(x, y, label="Actual UAV trajectory", linewidth=2)
-plt.plot(x_ref, y_ref, "--", label="Reference (ideal) trajectory", alpha=0.8)
+plt.plot(decimate(x), decimate(y), label="Actual UAV trajectory", linewidth=2)
+plt.plot(decimate(x_ref), decimate(y_ref), "--", label="Reference (ideal) trajectory", alpha=0.8)
 
 plt.scatter(x[0], y[0], c="green", s=60, label="Start")
 plt.scatter(x[-1], y[-1], c="red", s=60, label="End")
@@ -44,4 +51,5 @@ plt.title("Actual vs Reference XY Trajectory (Offboard Position Control)")
 plt.legend()
 
 plt.savefig(OUT_PNG, dpi=200, bbox_inches="tight")
+plt.close()
 print(f"Saved → {OUT_PNG}")
@@ -1,9 +1,13 @@
-import csv
-import math
 from pathlib import Path
 
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
+import analysis._style  # noqa: F401
+from analysis._io import load_telemetry
+from analysis._plot import decimate
 from src.trajectories.figure8 import Figure8Trajectory
 
 
@@ -51,44 +55,34 @@ OMEGA = 0.3
 # Load telemetry CSV
 # --------------------------------------------------
 
-t = []
-
-x = []
-y = []
-z = []
-
-vx = []
-vy = []
-vz = []
-
-roll = []
-pitch = []
-yaw = []
+df = load_telemetry(
+    CSV_PATH,
+    cols=[
+        COL_T,
+        COL_X, COL_Y, COL_Z,
+        COL_VX, COL_VY, COL_VZ,
+        COL_ROLL, COL_PITCH, COL_YAW,
+    ],
+)
 
-with open(CSV_PATH, newline="") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        t.append(float(row[COL_T]))
+t = df[COL_T].to_numpy()
 
-        x.append(float(row[COL_X]))
-        y.append(float(row[COL_Y]))
-        z.append(float(row[COL_Z]))
+x = df[COL_X].to_numpy()
+y = df[COL_Y].to_numpy()
+z = df[COL_Z].to_numpy()
 
-        vx.append(float(row[COL_VX]))
-        vy.append(float(row[COL_VY]))
-        vz.append(float(row[COL_VZ]))
+vel = df[[COL_VX, COL_VY, COL_VZ]].to_numpy(dtype=np.float64)  # (N, 3)
 
-        roll.append(float(row[COL_ROLL]))
-        pitch.append(float(row[COL_PITCH]))
-        yaw.append(float(row[COL_YAW]))
+roll = df[COL_ROLL].to_numpy()
+pitch = df[COL_PITCH].to_numpy()
+yaw = df[COL_YAW].to_numpy()
 
 
 # --------------------------------------------------
 # Normalize time
 # --------------------------------------------------
 
-t0 = t[0]
-t_rel = [ti - t0 for ti in t]
+t_rel = t - t[0]
 
 
 # --------------------------------------------------
@@ -102,13 +96,7 @@ trajectory = Figure8Trajectory(
     center_y=0.0,
 )
 
-x_ref = []
-y_ref = []
-
-for ti in t_rel:
-    xr, yr = trajectory.position_xy(ti)
-    x_ref.append(xr)
-    y_ref.append(yr)
+x_ref, y_ref = trajectory.position_xy_array(t_rel)
 
 
 # --------------------------------------------------
@@ -116,19 +104,13 @@ for ti in t_rel:
 # --------------------------------------------------
 
 # Drift (XY position error)
-drift = [
-    math.hypot(x[i] - x_ref[i], y[i] - y_ref[i])
-    for i in range(len(t_rel))
-]
+drift = np.hypot(x - x_ref, y - y_ref)
 
 # Speed magnitude
-speed = [
-    math.sqrt(vx[i] ** 2 + vy[i] ** 2 + vz[i] ** 2)
-    for i in range(len(t_rel))
-]
+speed = np.linalg.norm(vel, axis=1)
 
 # Altitude (positive up)
-altitude = [-zi for zi in z]
+altitude = -z
 
 
 # --------------------------------------------------
@@ -137,40 +119,23 @@ altitude = [-zi for zi in z]
 
 fig, axs = plt.subplots(2, 3, figsize=(15, 8), sharex=True)
 
-# ---- Row 1 ----
-axs[0, 0].plot(t_rel, drift)
-axs[0, 0].set_title("Position Error (Drift)")
-axs[0, 0].set_ylabel("m")
-axs[0, 0].grid(True)
-
-axs[0, 1].plot(t_rel, speed)
-axs[0, 1].set_title("Speed")
-axs[0, 1].set_ylabel("m/s")
-axs[0, 1].grid(True)
-
-axs[0, 2].plot(t_rel, yaw)
-axs[0, 2].set_title("Yaw")
-axs[0, 2].set_ylabel("deg")
-axs[0, 2].grid(True)
-
-# ---- Row 2 ----
-axs[1, 0].plot(t_rel, roll)
-axs[1, 0].set_title("Roll")
-axs[1, 0].set_ylabel("deg")
-axs[1, 0].grid(True)
-
-axs[1, 1].plot(t_rel, pitch)
-axs[1, 1].set_title("Pitch")
-axs[1, 1].set_ylabel("deg")
-axs[1, 1].grid(True)
-
-axs[1, 2].plot(t_rel, altitude)
-axs[1, 2].set_title("Altitude")
-axs[1, 2].set_ylabel("m")
-axs[1, 2].grid(True)
-
-for ax in axs[1, :]:
-    ax.set_xlabel("Time [s]")
+t_rel_plot = decimate(t_rel)
+
+panels = [
+    (axs[0, 0], drift, "Position Error (Drift)", "m"),
+    (axs[0, 1], speed, "Speed", "m/s"),
+    (axs[0, 2], yaw, "Yaw", "deg"),
+    (axs[1, 0], roll, "Roll", "deg"),
+    (axs[1, 1], pitch, "Pitch", "deg"),
+    (axs[1, 2], altitude, "Altitude", "m"),
+]
+
+for ax, values, title, ylabel in panels:
+    ax.plot(t_rel_plot, decimate(values))
+    ax.set(title=title, ylabel=ylabel)
+    ax.grid(True)
+
+fig.supxlabel("Time [s]")
 
 fig.suptitle("Figure-8 Autonomous Flight — Time-Series Summary", fontsize=14)
 
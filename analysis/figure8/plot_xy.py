@@ -1,11 +1,15 @@
-import csv
 from pathlib import Path
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
 # --------------------------------------------------
 # Import trajectory (single source of truth)
 # --------------------------------------------------
 
+import analysis._style  # noqa: F401
+from analysis._io import load_telemetry
+from analysis._plot import decimate
 from src.trajectories.figure8 import Figure8Trajectory
 
 
@@ -26,23 +30,17 @@ OUTPUT_PNG = OUTPUT_DIR / "xy_actual_vs_reference.png"
 # Load telemetry CSV (actual trajectory)
 # --------------------------------------------------
 
-t = []
-x_actual = []
-y_actual = []
+df = load_telemetry(CSV_PATH, cols=["t", "north_m", "east_m"])
 
-with open(CSV_PATH, newline="") as f:
-    reader = csv.DictReader(f)
-    for row in reader:
-        t.append(float(row["t"]))
-        x_actual.append(float(row["north_m"]))
-        y_actual.append(float(row["east_m"]))
+t = df["t"].to_numpy()
+x_actual = df["north_m"].to_numpy()
+y_actual = df["east_m"].to_numpy()
 
 # --------------------------------------------------
 # Normalize time (t = 0 at mission start)
 # --------------------------------------------------
 
-t0 = t[0]
-t_rel = [ti - t0 for ti in t]
+t_rel = t - t[0]
 
 
 # --------------------------------------------------
@@ -56,13 +54,7 @@ trajectory = Figure8Trajectory(
     center_y=0.0,
 )
 
-x_ref = []
-y_ref = []
-
-for ti in t_rel:
-    x, y = trajectory.position_xy(ti)
-    x_ref.append(x)
-    y_ref.append(y)
+x_ref, y_ref = trajectory.position_xy_array(t_rel)
 
 
 # --------------------------------------------------
@@ -72,16 +64,16 @@ for ti in t_rel:
 plt.figure(figsize=(7, 7))
 
 plt.plot(
-    x_ref,
-    y_ref,
+    decimate(x_ref),
+    decimate(y_ref),
     linestyle="--",
     linewidth=2,
     label="Reference Figure-8"
 )
 
 plt.plot(
-    x_actual,
-    y_actual,
+    decimate(x_actual),
+    decimate(y_actual),
     linewidth=2,
     label="Actual UAV Trajectory"
 )
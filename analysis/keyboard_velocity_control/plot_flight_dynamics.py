@@ -1,8 +1,13 @@
-import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+import analysis._style  # noqa: F401
+from analysis._io import load_telemetry
+from analysis._plot import decimate
+
 # ================= CONFIG =================
 
 CSV_PATH = Path("logs/csv/keyboard_velocity_control_20260206_202037.csv")
@@ -11,40 +16,39 @@ SAVE_DIR.mkdir(parents=True, exist_ok=True)
 
 # ================= LOAD =================
 
-df = pd.read_csv(CSV_PATH)
+df = load_telemetry(CSV_PATH, cols=["t", "vn_m_s", "ve_m_s", "vd_m_s", "yaw_deg"], float32=True)
 
-t = df["t"]
+t = df["t"].to_numpy(copy=False)
 
-vn = df["vn_m_s"]
-ve = df["ve_m_s"]
-vd = df["vd_m_s"]
+# (N, 3) block so the three components go to matplotlib in one call
+vel = df[["vn_m_s", "ve_m_s", "vd_m_s"]].to_numpy(dtype=np.float32)
 
-yaw = df["yaw_deg"]
+yaw = df["yaw_deg"].to_numpy(copy=False)
 
 # speed magnitude
-speed = np.sqrt(vn**2 + ve**2 + vd**2)
+speed = np.linalg.norm(vel, axis=1)
 
 # ================= PLOT =================
 
+t_plot = decimate(t)
+
 fig, axs = plt.subplots(3, 1, figsize=(10, 12), sharex=True)
 
 # --- velocities ---
-axs[0].plot(t, vn, label="Vn")
-axs[0].plot(t, ve, label="Ve")
-axs[0].plot(t, vd, label="Vd")
+axs[0].plot(t_plot, decimate(vel), label=["Vn", "Ve", "Vd"])
 axs[0].set_ylabel("Velocity (m/s)")
 axs[0].set_title("Velocity Components")
 axs[0].grid(True)
 axs[0].legend()
 
 # --- yaw ---
-axs[1].plot(t, yaw)
+axs[1].plot(t_plot, decimate(yaw))
 axs[1].set_ylabel("Yaw (deg)")
 axs[1].set_title("Heading (Yaw)")
 axs[1].grid(True)
 
 # --- speed magnitude ---
-axs[2].plot(t, speed)
+axs[2].plot(t_plot, decimate(speed))
 axs[2].set_ylabel("Speed (m/s)")
 axs[2].set_title("Speed Magnitude")
 axs[2].set_xlabel("Time (s)")
@@ -56,4 +60,5 @@ plt.tight_layout()
 
 out_path = SAVE_DIR / "flight_dynamics_overview.png"
 plt.savefig(out_path, dpi=200)
+plt.close()
 print(f"Saved → {out_path}")
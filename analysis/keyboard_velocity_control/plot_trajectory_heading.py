@@ -1,45 +1,54 @@
-import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+import analysis._style  # noqa: F401
+from analysis._io import load_telemetry
+from analysis._plot import decimate
+
 # ================= CONFIG =================
 
 CSV_PATH = Path("logs/csv/keyboard_velocity_control_20260206_202037.csv")
 SAVE_DIR = Path("analysis/keyboard_velocity_control/outputs")
 SAVE_DIR.mkdir(parents=True, exist_ok=True)
 
-# how often to draw arrows (reduce clutter)
-ARROW_EVERY = 20
+# how often to draw arrows, in seconds of log time (reduce clutter)
+ARROW_EVERY_S = 2.0
 
 # ================= LOAD =================
 
-df = pd.read_csv(CSV_PATH)
+df = load_telemetry(CSV_PATH, cols=["t", "north_m", "east_m", "yaw_deg"], float32=True)
 
-x = df["north_m"]
-y = df["east_m"]
-yaw_deg = df["yaw_deg"]
+t = df["t"].to_numpy()
+x = df["north_m"].to_numpy()
+y = df["east_m"].to_numpy()
+yaw_deg = df["yaw_deg"].to_numpy()
 
-# convert yaw → radians
-yaw = np.deg2rad(yaw_deg)
+# first sample of each ARROW_EVERY_S window (rows are not evenly spaced),
+# then convert yaw → radians (only arrow samples are needed)
+windows = np.floor((t - t[0]) / ARROW_EVERY_S)
+arrows = np.flatnonzero(np.diff(windows, prepend=-1.0))
+yaw = np.deg2rad(yaw_deg[arrows])
 
 # ================= PLOT =================
 
 plt.figure(figsize=(8, 8))
 
 # trajectory line
-plt.plot(x, y, linewidth=2, label="Trajectory")
+plt.plot(decimate(x), decimate(y), linewidth=2, label="Trajectory")
 
 # start & end
-plt.scatter(x.iloc[0], y.iloc[0], s=100, label="Start")
-plt.scatter(x.iloc[-1], y.iloc[-1], s=100, label="End")
+plt.scatter(x[0], y[0], s=100, label="Start")
+plt.scatter(x[-1], y[-1], s=100, label="End")
 
 # heading arrows
 plt.quiver(
-    x[::ARROW_EVERY],
-    y[::ARROW_EVERY],
-    np.cos(yaw[::ARROW_EVERY]),
-    np.sin(yaw[::ARROW_EVERY]),
+    x[arrows],
+    y[arrows],
+    np.cos(yaw),
+    np.sin(yaw),
     angles="xy",
     scale_units="xy",
     scale=1,
@@ -57,4 +66,5 @@ plt.legend()
 
 out_path = SAVE_DIR / "trajectory_with_heading.png"
 plt.savefig(out_path, dpi=200)
+plt.close()
 print(f"Saved → {out_path}")
@@ -1,6 +1,11 @@
-import pandas as pd
-import matplotlib.pyplot as plt
 from pathlib import Path
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import analysis._style  # noqa: F401
+from analysis._io import load_telemetry
+from analysis._plot import decimate
 
 # ================= CONFIG =================
 CSV_PATH = Path("logs/csv/keyboard_velocity_control_20260206_202037.csv")
@@ -8,41 +13,42 @@ SAVE_DIR = Path("analysis/keyboard_velocity_control/outputs")
 SAVE_DIR.mkdir(parents=True, exist_ok=True)
 
 # ================= LOAD CSV =================
-df = pd.read_csv(CSV_PATH)
+df = load_telemetry(CSV_PATH, float32=True)
 
 # ======= column =======
-x = df["north_m"]
-y = df["east_m"]
-alt = -df["down_m"]  # NED -> altitude
+x = df["north_m"].to_numpy(copy=False)
+y = df["east_m"].to_numpy(copy=False)
+alt = -df["down_m"].to_numpy(copy=False)  # NED -> altitude
 
 # ================= PLOT XY =================
-plt.figure(figsize=(7, 7))
-plt.plot(x, y, label="Trajectory", linewidth=2)
-plt.scatter(x.iloc[0], y.iloc[0], c="green", s=80, label="Start")
-plt.scatter(x.iloc[-1], y.iloc[-1], c="red", s=80, label="End")
-
-plt.xlabel("North (m)")
-plt.ylabel("East (m)")
-plt.title("Keyboard Offboard Trajectory (Top View)")
-plt.axis("equal")
-plt.grid(True)
-plt.legend()
-
-plt.savefig(SAVE_DIR / "keyboard_xy_trajectory.png", dpi=200)
-plt.show()
+# Figures are built without pyplot and rendered straight through Agg
+fig = Figure(figsize=(7, 7), dpi=200)
+ax = fig.add_subplot(111)
+ax.plot(decimate(x), decimate(y), label="Trajectory", linewidth=2)
+ax.scatter(x[0], y[0], c="green", s=80, label="Start")
+ax.scatter(x[-1], y[-1], c="red", s=80, label="End")
+
+ax.set_xlabel("North (m)")
+ax.set_ylabel("East (m)")
+ax.set_title("Keyboard Offboard Trajectory (Top View)")
+ax.axis("equal")
+ax.grid(True)
+ax.legend()
+
+FigureCanvasAgg(fig).print_png(SAVE_DIR / "keyboard_xy_trajectory.png")
 
 # ================= ALTITUDE =================
-plt.figure(figsize=(8, 4))
+fig = Figure(figsize=(8, 4), dpi=200)
+ax = fig.add_subplot(111)
 if "unix_time" in df.columns:
-    plt.plot(df["unix_time"], alt, linewidth=2)
-    plt.xlabel("Unix Time (s)")
+    ax.plot(decimate(df["unix_time"].to_numpy(copy=False)), decimate(alt), linewidth=2)
+    ax.set_xlabel("Unix Time (s)")
 else:
-    plt.plot(alt, linewidth=2)
-    plt.xlabel("Sample index")
+    ax.plot(decimate(np.arange(len(alt))), decimate(alt), linewidth=2)
+    ax.set_xlabel("Sample index")
 
-plt.ylabel("Altitude (m)")
-plt.title("Altitude Profile")
-plt.grid(True)
+ax.set_ylabel("Altitude (m)")
+ax.set_title("Altitude Profile")
+ax.grid(True)
 
-plt.savefig(SAVE_DIR / "xy_altitude.png", dpi=200)
-plt.show()
+FigureCanvasAgg(fig).print_png(SAVE_DIR / "xy_altitude.png")
@@ -1,28 +1,33 @@
-import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from pathlib import Path
 from mpl_toolkits.mplot3d import Axes3D
 
+import analysis._style  # noqa: F401
+from analysis._io import load_telemetry
+from analysis._plot import decimate
+
 # ================= CONFIG =================
 CSV_PATH = Path("logs/csv/keyboard_velocity_control_20260206_202037.csv")
 SAVE_DIR = Path("analysis/keyboard_velocity_control/outputs")
 SAVE_DIR.mkdir(parents=True, exist_ok=True)
 
 # ================= LOAD CSV =================
-df = pd.read_csv(CSV_PATH)
+df = load_telemetry(CSV_PATH, cols=["north_m", "east_m", "down_m"], float32=True)
 
 # ======= column =======
-x = df["north_m"]
-y = df["east_m"]
-z = -df["down_m"]  # NED → altitude
+x = df["north_m"].to_numpy(copy=False)
+y = df["east_m"].to_numpy(copy=False)
+z = -df["down_m"].to_numpy(copy=False)  # NED → altitude
 
 # ================= PLOT 3D =================
 fig = plt.figure(figsize=(8, 6))
 ax = fig.add_subplot(111, projection='3d')
 
-ax.plot(x, y, z, label="Trajectory", linewidth=2, color='blue')
-ax.scatter(x.iloc[0], y.iloc[0], z.iloc[0], c="green", s=80, label="Start")
-ax.scatter(x.iloc[-1], y.iloc[-1], z.iloc[-1], c="red", s=80, label="End")
+ax.plot(decimate(x), decimate(y), decimate(z), label="Trajectory", linewidth=2, color='blue')
+ax.scatter(x[0], y[0], z[0], c="green", s=80, label="Start")
+ax.scatter(x[-1], y[-1], z[-1], c="red", s=80, label="End")
 
 ax.set_xlabel("North (m)")
 ax.set_ylabel("East (m)")
@@ -0,0 +1,116 @@
+"""
+Shared spiral mission dataset for the spiral analysis scripts.
+
+Holds the log location, the mission trajectory parameters (single source
+of truth for every spiral plot) and the parsed telemetry + reference
+arrays (position, velocity, attitude and the mission markers). The
+dataset is memoized per CSV mtime, so scripts that run in the same
+process parse and sample once; across processes the Parquet cache in
+`analysis._io` serves the reload.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from analysis._io import load_mission_log
+from src.trajectories.spiral import SpiralTrajectory
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+CSV_PATH = REPO_ROOT / "logs" / "csv" / "spiral_position_mission_log.csv"
+
+# Trajectory parameters (MUST match mission)
+ALTITUDE_M = 2.5
+CLIMB_M = 5.0
+RADIUS_M = 3.0
+OMEGA = 0.3
+
+
+def make_trajectory() -> SpiralTrajectory:
+    return SpiralTrajectory(
+        radius=RADIUS_M,
+        start_z=-ALTITUDE_M,
+        end_z=-(ALTITUDE_M + CLIMB_M),
+        omega=OMEGA,
+    )
+
+
+# Every column any spiral plot needs, so one parse serves all of them
+COLS = [
+    "t", "unix_time",
+    "north_m", "east_m", "down_m",
+    "vn_m_s", "ve_m_s", "vd_m_s",
+    "roll_deg", "pitch_deg", "yaw_deg",
+    "mission_phase", "mission_t0_unix",
+]
+
+
+@dataclass(frozen=True)
+class SpiralDataset:
+    # Actual path, time relative to the first logged sample
+    t_rel: np.ndarray
+    x: np.ndarray
+    y: np.ndarray
+    z: np.ndarray
+
+    # Velocity (NED) and attitude per sample
+    vx: np.ndarray
+    vy: np.ndarray
+    vz: np.ndarray
+    roll: np.ndarray
+    pitch: np.ndarray
+    yaw: np.ndarray
+
+    # Mission markers, for phase selection and t0 alignment
+    unix_time: np.ndarray
+    mission_phase: np.ndarray
+    mission_t0_unix: np.ndarray
+
+    # Reference path over one trajectory duration
+    t_ref: np.ndarray
+    x_ref: np.ndarray
+    y_ref: np.ndarray
+    z_ref: np.ndarray
+
+
+@lru_cache(maxsize=4)
+def _load(csv_path: Path, mtime: float) -> SpiralDataset:
+    log = load_mission_log(csv_path, cols=COLS)
+
+    t_rel = log["t"] - log["t"][0]
+
+    trajectory = make_trajectory()
+    t_ref = t_rel[t_rel <= trajectory.duration()]
+    x_ref, y_ref, z_ref = trajectory.position_xyz_array(t_ref)
+
+    return SpiralDataset(
+        t_rel=t_rel,
+        x=log["north_m"],
+        y=log["east_m"],
+        z=log["down_m"],
+        vx=log["vn_m_s"],
+        vy=log["ve_m_s"],
+        vz=log["vd_m_s"],
+        roll=log["roll_deg"],
+        pitch=log["pitch_deg"],
+        yaw=log["yaw_deg"],
+        unix_time=log["unix_time"],
+        mission_phase=log["mission_phase"],
+        mission_t0_unix=log["mission_t0_unix"],
+        t_ref=t_ref,
+        x_ref=x_ref,
+        y_ref=y_ref,
+        z_ref=z_ref,
+    )
+
+
+def load_spiral_dataset(csv_path: Path = CSV_PATH) -> SpiralDataset:
+    """
+    Load the spiral log and its reference, reusing the parse while the
+    CSV is unchanged.
+    """
+    csv_path = Path(csv_path)
+    return _load(csv_path, csv_path.stat().st_mtime)
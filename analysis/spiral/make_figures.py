@@ -0,0 +1,23 @@
+"""
+Regenerate every spiral figure in one interpreter.
+
+Running the three plot scripts separately pays interpreter start-up, the
+pandas/matplotlib imports and the CSV parse three times. Here their
+main() functions run back to back in a single process;
+`load_spiral_dataset()` is memoized and all three plots read from it, so
+the log is parsed once.
+
+Usage (from the repository root):
+    python3 -m analysis.spiral.make_figures
+"""
+
+from analysis.spiral import plot_time_series, plot_xy, plot_xyz_actual_vs_reference
+
+
+def main():
+    for script in (plot_time_series, plot_xy, plot_xyz_actual_vs_reference):
+        script.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,196 +9,206 @@ What this script does (scientifically correct):
 5) Produces a clean 2x3 dashboard
 """
 
-import csv
-import math
 from pathlib import Path
-import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
 
-from src.trajectories.spiral import SpiralTrajectory
+from analysis._io import iter_telemetry_chunks
+from analysis._plot import decimate
+from analysis.spiral._dataset import CSV_PATH, load_spiral_dataset, make_trajectory
 
 
 # --------------------------------------------------
 # Paths
 # --------------------------------------------------
 
-REPO_ROOT = Path(__file__).resolve().parents[2]
-CSV_PATH = REPO_ROOT / "logs" / "spiral_position_mission_log.csv"
-
 OUTPUT_DIR = Path(__file__).resolve().parent / "outputs"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
 OUTPUT_PNG = OUTPUT_DIR / "spiral_time_series_corrected.png"
 
+# The drift search allocates (rows x samples) grids, so keep chunks modest
+CHUNK_ROWS = 50_000
+
 
 # --------------------------------------------------
-# Trajectory parameters (MUST match mission)
+# Helper: closest-point geometric drift (3D)
 # --------------------------------------------------
 
-ALTITUDE_M = 2.5
-CLIMB_M = 5.0
-RADIUS_M = 3.0
-OMEGA = 0.3
+def geometric_drift_3d(xa, ya, za, trajectory, t_center, window=0.5, samples=40):
+    """
+    Compute geometric drift as minimum distance to reference trajectory
+    around each time in t_center (sliding window search).
 
+    All samples are searched at once: row i of the tau grid spans
+    [max(0, t_i - window), t_i + window] with `samples` points.
+    """
+    t_start = np.maximum(0.0, t_center - window)
+    t_end = t_center + window
 
-# --------------------------------------------------
-# Load CSV (TRAJECTORY phase only)
-# --------------------------------------------------
+    frac = np.linspace(0.0, 1.0, samples)
+    tau = t_start[:, None] + (t_end - t_start)[:, None] * frac[None, :]
 
-t = []
-x = []
-y = []
-z = []
+    xr, yr, zr = trajectory.position_xyz_array(tau)
 
-vx = []
-vy = []
-vz = []
+    d2 = (
+        (xa[:, None] - xr) ** 2 +
+        (ya[:, None] - yr) ** 2 +
+        (za[:, None] - zr) ** 2
+    )
 
-roll = []
-pitch = []
-yaw = []
+    return np.sqrt(d2.min(axis=1))
 
-mission_t0 = None
 
-with open(CSV_PATH, newline="") as f:
-    reader = csv.DictReader(f)
+# --------------------------------------------------
+# TRAJECTORY-phase metrics
+# --------------------------------------------------
 
-    for row in reader:
-        if row["mission_phase"] != "TRAJECTORY":
+def _metrics_frame(t, x, y, z, vel, yaw, roll, pitch, trajectory) -> pd.DataFrame:
+    # The drift grid is (rows x samples), so search it CHUNK_ROWS at a time
+    drift_geo = np.concatenate([
+        geometric_drift_3d(
+            x[i:i + CHUNK_ROWS], y[i:i + CHUNK_ROWS], z[i:i + CHUNK_ROWS],
+            trajectory, t[i:i + CHUNK_ROWS],
+        )
+        for i in range(0, len(t), CHUNK_ROWS)
+    ])
+
+    return pd.DataFrame({
+        "t": t,
+        "drift_geo": drift_geo,
+        "speed": np.linalg.norm(vel, axis=1),
+        "yaw": yaw,
+        "roll": roll,
+        "pitch": pitch,
+        "altitude": -z,  # positive up
+    })
+
+
+def _load_metrics_chunked(csv_path, trajectory) -> pd.DataFrame:
+    metrics = []
+    mission_t0 = None
+
+    for chunk in iter_telemetry_chunks(
+        csv_path,
+        cols=[
+            "unix_time", "mission_phase", "mission_t0_unix",
+            "north_m", "east_m", "down_m",
+            "vn_m_s", "ve_m_s", "vd_m_s",
+            "roll_deg", "pitch_deg", "yaw_deg",
+        ],
+        chunksize=CHUNK_ROWS,
+    ):
+        chunk = chunk.loc[chunk["mission_phase"].eq("TRAJECTORY")]
+        if chunk.empty:
             continue
 
         if mission_t0 is None:
-            mission_t0 = float(row["mission_t0_unix"])
+            mission_t0 = float(chunk["mission_t0_unix"].iloc[0])
+
+        metrics.append(_metrics_frame(
+            chunk["unix_time"].to_numpy() - mission_t0,
+            chunk["north_m"].to_numpy(),
+            chunk["east_m"].to_numpy(),
+            chunk["down_m"].to_numpy(),
+            chunk[["vn_m_s", "ve_m_s", "vd_m_s"]].to_numpy(dtype=np.float64),
+            chunk["yaw_deg"].to_numpy(),
+            chunk["roll_deg"].to_numpy(),
+            chunk["pitch_deg"].to_numpy(),
+            trajectory,
+        ))
 
-        unix_time = float(row["unix_time"])
-        t.append(unix_time - mission_t0)
+    assert mission_t0 is not None, "No TRAJECTORY phase found in CSV"
 
-        x.append(float(row["north_m"]))
-        y.append(float(row["east_m"]))
-        z.append(float(row["down_m"]))
+    return pd.concat(metrics, ignore_index=True)
 
-        vx.append(float(row["vn_m_s"]))
-        vy.append(float(row["ve_m_s"]))
-        vz.append(float(row["vd_m_s"]))
 
-        roll.append(float(row["roll_deg"]))
-        pitch.append(float(row["pitch_deg"]))
-        yaw.append(float(row["yaw_deg"]))
+def load_metrics(csv_path=CSV_PATH, trajectory=None, chunked: bool = False) -> pd.DataFrame:
+    """
+    Per-sample TRAJECTORY-phase metrics.
 
-assert mission_t0 is not None, "No TRAJECTORY phase found in CSV"
+    Reduces the shared spiral dataset, so in one process this reuses the
+    parse the other spiral plots make. `chunked=True` instead streams
+    the CSV chunk by chunk, for logs too large to hold in memory.
+    """
+    if trajectory is None:
+        trajectory = make_trajectory()
 
+    if chunked:
+        return _load_metrics_chunked(csv_path, trajectory)
 
-# --------------------------------------------------
-# Reference trajectory (single source of truth)
-# --------------------------------------------------
+    data = load_spiral_dataset(csv_path)
 
-trajectory = SpiralTrajectory(
-    radius=RADIUS_M,
-    start_z=-ALTITUDE_M,
-    end_z=-(ALTITUDE_M + CLIMB_M),
-    omega=OMEGA,
-)
+    sel = data.mission_phase == "TRAJECTORY"
+    assert sel.any(), "No TRAJECTORY phase found in CSV"
+
+    mission_t0 = float(data.mission_t0_unix[sel][0])
+
+    return _metrics_frame(
+        data.unix_time[sel] - mission_t0,
+        data.x[sel],
+        data.y[sel],
+        data.z[sel],
+        np.column_stack((data.vx[sel], data.vy[sel], data.vz[sel])).astype(np.float64),
+        data.yaw[sel],
+        data.roll[sel],
+        data.pitch[sel],
+        trajectory,
+    )
 
 
 # --------------------------------------------------
-# Helper: closest-point geometric drift (3D)
+# Plot: 2x3 corrected dashboard
 # --------------------------------------------------
 
-def geometric_drift_3d(xa, ya, za, trajectory, t_center, window=0.5, samples=40):
-    """
-    Compute geometric drift as minimum distance to reference trajectory
-    around time t_center (sliding window search).
-    """
-    t_start = max(0.0, t_center - window)
-    t_end = t_center + window
+def main():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
 
-    min_dist = float("inf")
+    import analysis._style  # noqa: F401
 
-    for i in range(samples):
-        tau = t_start + (t_end - t_start) * i / (samples - 1)
-        xr, yr, zr = trajectory.position_xyz(tau)
+    df = load_metrics()
 
-        d = math.sqrt(
-            (xa - xr) ** 2 +
-            (ya - yr) ** 2 +
-            (za - zr) ** 2
-        )
-        min_dist = min(min_dist, d)
+    t = df["t"].to_numpy()
+    drift_geo = df["drift_geo"].to_numpy()
+    speed = df["speed"].to_numpy()
+    yaw = df["yaw"].to_numpy()
+    roll = df["roll"].to_numpy()
+    pitch = df["pitch"].to_numpy()
+    altitude = df["altitude"].to_numpy()
 
-    return min_dist
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+    fig, axs = plt.subplots(2, 3, figsize=(15, 8), sharex=True)
 
-# --------------------------------------------------
-# Compute metrics
-# --------------------------------------------------
+    t_plot = decimate(t)
 
-drift_geo = []
-speed = []
-altitude = []
+    panels = [
+        (axs[0, 0], drift_geo, "Geometric Drift (3D)", "m"),
+        (axs[0, 1], speed, "Speed Magnitude", "m/s"),
+        (axs[0, 2], yaw, "Yaw", "deg"),
+        (axs[1, 0], roll, "Roll", "deg"),
+        (axs[1, 1], pitch, "Pitch", "deg"),
+        (axs[1, 2], altitude, "Altitude", "m"),
+    ]
 
-for i in range(len(t)):
-    drift_geo.append(
-        geometric_drift_3d(
-            x[i], y[i], z[i],
-            trajectory,
-            t[i]
-        )
-    )
+    for ax, values, title, ylabel in panels:
+        ax.plot(t_plot, decimate(values))
+        ax.set(title=title, ylabel=ylabel)
+        ax.grid(True)
+
+    fig.supxlabel("Time since trajectory start [s]")
 
-    speed.append(
-        math.sqrt(vx[i] ** 2 + vy[i] ** 2 + vz[i] ** 2)
+    fig.suptitle(
+        "Spiral (Helical) Autonomous Flight — Corrected Time-Series Analysis",
+        fontsize=14
     )
 
-    altitude.append(-z[i])  # positive up
+    plt.tight_layout(rect=[0, 0, 1, 0.95])
+    plt.savefig(OUTPUT_PNG, dpi=200)
+    plt.close(fig)
 
+    print(f"Saved corrected analysis plot → {OUTPUT_PNG}")
 
-# --------------------------------------------------
-# Plot: 2x3 corrected dashboard
-# --------------------------------------------------
 
-fig, axs = plt.subplots(2, 3, figsize=(15, 8), sharex=True)
-
-# ---- Row 1 ----
-axs[0, 0].plot(t, drift_geo)
-axs[0, 0].set_title("Geometric Drift (3D)")
-axs[0, 0].set_ylabel("m")
-axs[0, 0].grid(True)
-
-axs[0, 1].plot(t, speed)
-axs[0, 1].set_title("Speed Magnitude")
-axs[0, 1].set_ylabel("m/s")
-axs[0, 1].grid(True)
-
-axs[0, 2].plot(t, yaw)
-axs[0, 2].set_title("Yaw")
-axs[0, 2].set_ylabel("deg")
-axs[0, 2].grid(True)
-
-# ---- Row 2 ----
-axs[1, 0].plot(t, roll)
-axs[1, 0].set_title("Roll")
-axs[1, 0].set_ylabel("deg")
-axs[1, 0].grid(True)
-
-axs[1, 1].plot(t, pitch)
-axs[1, 1].set_title("Pitch")
-axs[1, 1].set_ylabel("deg")
-axs[1, 1].grid(True)
-
-axs[1, 2].plot(t, altitude)
-axs[1, 2].set_title("Altitude")
-axs[1, 2].set_ylabel("m")
-axs[1, 2].grid(True)
-
-for ax in axs[1, :]:
-    ax.set_xlabel("Time since trajectory start [s]")
-
-fig.suptitle(
-    "Spiral (Helical) Autonomous Flight — Corrected Time-Series Analysis",
-    fontsize=14
-)
-
-plt.tight_layout(rect=[0, 0, 1, 0.95])
-plt.savefig(OUTPUT_PNG, dpi=200)
-plt.close()
-
-print(f"Saved corrected analysis plot → {OUTPUT_PNG}")
+if __name__ == "__main__":
+    main()
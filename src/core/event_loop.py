@@ -0,0 +1,26 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+from .rt_setup import enable_rt
+
+
+def run_mission(main: Callable[[], Awaitable[Any]], rt_cpu: Optional[int] = None) -> Any:
+    """
+    Run a mission's async main() to completion.
+
+    Uses uvloop (>= 0.18) when it is installed, for lower per-await
+    overhead and scheduling jitter across the setpoint/watchdog/logger
+    tasks; falls back to the default asyncio loop otherwise, e.g. on
+    Windows.
+
+    Scheduling priority is raised first (see enable_rt); pass rt_cpu to
+    also pin the process to one core.
+    """
+    enable_rt(cpu=rt_cpu)
+
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main())
+
+    return uvloop.run(main())
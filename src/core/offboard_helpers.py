@@ -1,11 +1,129 @@
 import asyncio
+import time
+from typing import Optional
 from mavsdk import System
 from mavsdk.offboard import PositionNedYaw, OffboardError
 
+
+# Floor for the adaptive set-point rate in fly_setpoint_table
+SETPOINT_MIN_RATE_HZ = 5.0
+
+
+class DeadlineTicker:
+    """
+    Fixed-rate loop pacing on the event loop's monotonic clock.
+
+    wait() sleeps until the next absolute deadline, so time spent sending a
+    setpoint does not stretch the period. A tick that starts more than
+    half a period late is counted as an overrun; whole missed periods are
+    dropped rather than sent as a catch-up burst.
+
+    With min_rate_hz set, the period adapts: if more than a quarter of the
+    ticks in a window overrun, the period doubles (down to min_rate_hz),
+    and it halves back toward the nominal rate after a clean window.
+    """
+
+    WINDOW_TICKS = 20
+    MAX_LATE_FRACTION = 0.25
+
+    def __init__(self, rate_hz: float, min_rate_hz: Optional[float] = None):
+        self.dt = 1.0 / rate_hz
+        self._nominal_dt = self.dt
+        self._max_dt = self.dt if min_rate_hz is None else 1.0 / min_rate_hz
+        self._loop = asyncio.get_running_loop()
+        self.next_t = self._loop.time()
+        self.overruns = 0
+        self.max_lag_s = 0.0
+        self.backoffs = 0
+        self._window_ticks = 0
+        self._window_late = 0
+
+    async def wait(self) -> None:
+        self.next_t += self.dt
+        now = self._loop.time()
+        delay = self.next_t - now
+        if delay < -0.5 * self.dt:
+            self.overruns += 1
+            self._window_late += 1
+            self.max_lag_s = max(self.max_lag_s, -delay)
+            if delay < -self.dt:
+                self.next_t = now
+
+        self._window_ticks += 1
+        if self._window_ticks == self.WINDOW_TICKS and self._max_dt > self._nominal_dt:
+            self._adapt()
+
+        # A late tick sleeps 0: asyncio.sleep's zero-delay fast path is a
+        # bare yield, with no timer-heap entry. Real waits are for cadence only.
+        await asyncio.sleep(max(0.0, delay))
+
+    def _adapt(self) -> None:
+        if self._window_late > self.MAX_LATE_FRACTION * self._window_ticks:
+            if self.dt < self._max_dt:
+                self.dt = min(self._max_dt, self.dt * 2.0)
+                self.backoffs += 1
+        else:
+            self.dt = max(self._nominal_dt, self.dt * 0.5)
+        self._window_ticks = 0
+        self._window_late = 0
+
+    def report(self, name: str) -> None:
+        if self.overruns:
+            print(
+                f"⚠️ {name}: {self.overruns} late ticks "
+                f"(max lag {self.max_lag_s * 1000.0:.0f} ms)"
+            )
+        if self.backoffs:
+            print(
+                f"⚠️ {name}: rate backed off {self.backoffs} times "
+                f"(floor {1.0 / self._max_dt:.0f} Hz)"
+            )
+
+
+async def fly_setpoint_table(drone: System, state, table, duration_s: float, rate_hz: float, t0: float, name: str):
+    """
+    Stream a precomputed (north_m, east_m, down_m, yaw_deg) set-point table.
+
+    table[i] is the set-point for t = i / rate_hz on the mission clock
+    (t = time.monotonic() - t0). Runs until duration_s has elapsed, the
+    mission stops, or the watchdog raises an emergency stop.
+
+    Lookups are by elapsed time, so if the ticker backs off under load the
+    vehicle still follows the reference on schedule, just with fewer
+    set-points (PX4 only needs > 2 Hz in offboard).
+    """
+    last = len(table) - 1
+    setpoint = PositionNedYaw(*table[0])
+    ticker = DeadlineTicker(rate_hz, min_rate_hz=SETPOINT_MIN_RATE_HZ)
+    set_position_ned = drone.offboard.set_position_ned  # hoisted out of the loop
+
+    while state.running and not state.emergency_stop:
+        t = time.monotonic() - t0
+
+        if t > duration_s:
+            break
+
+        # Nearest tick; on the deadline schedule this is the tick count
+        (
+            setpoint.north_m,
+            setpoint.east_m,
+            setpoint.down_m,
+            setpoint.yaw_deg,
+        ) = table[min(int(t * rate_hz + 0.5), last)]
+
+        await set_position_ned(setpoint)
+        await ticker.wait()
+
+    ticker.report(name)
+
+
 async def prestream_position_setpoints(drone: System, down_m: float, yaw_deg: float = 0.0, n: int = 20):
+    """PX4 requires setpoints to be streamed before starting offboard."""
+    setpoint = PositionNedYaw(0.0, 0.0, down_m, yaw_deg)
+    ticker = DeadlineTicker(20.0)
     for _ in range(n):
-        await drone.offboard.set_position_ned(PositionNedYaw(0.0, 0.0, down_m, yaw_deg))
-        await asyncio.sleep(0.05)
+        await drone.offboard.set_position_ned(setpoint)
+        await ticker.wait()
 
 async def start_offboard(drone: System) -> bool:
     try:
@@ -1,22 +1,45 @@
 import asyncio
+from typing import AsyncIterator, Callable, Optional, TypeVar
 from mavsdk import System
 
-async def connect_px4(system_address: str) -> System:
+T = TypeVar("T")
+
+
+async def await_first(
+    agen: AsyncIterator[T],
+    pred: Callable[[T], bool],
+    timeout: Optional[float] = None,
+) -> T:
+    """
+    Return the first item of a MAVSDK stream that satisfies pred.
+
+    The stream is closed as soon as the item arrives (or on timeout), so the
+    subscription does not keep delivering messages nobody reads.
+    Raises asyncio.TimeoutError if no match arrives within `timeout` seconds.
+    """
+    async def _first() -> T:
+        async for item in agen:
+            if pred(item):
+                return item
+        raise RuntimeError("stream ended before the awaited condition")
+
+    try:
+        return await asyncio.wait_for(_first(), timeout)
+    finally:
+        await agen.aclose()
+
+
+async def connect_px4(system_address: str, timeout_s: Optional[float] = 30.0) -> System:
     drone = System()
     await drone.connect(system_address=system_address)
 
     print("Waiting for drone to connect...")
-    async for state in drone.core.connection_state():
-        if state.is_connected:
-            print("-- Connected!")
-            break
+    await await_first(drone.core.connection_state(), lambda s: s.is_connected, timeout_s)
+    print("-- Connected!")
 
     return drone
 
-async def wait_armable(drone: System, sleep_s: float = 0.5) -> None:
+async def wait_armable(drone: System, timeout_s: Optional[float] = 60.0) -> None:
     print("Waiting for drone to be armable...")
-    async for health in drone.telemetry.health():
-        if health.is_armable:
-            print("Drone health OK. Ready to arm!")
-            break
-        await asyncio.sleep(sleep_s)
+    await await_first(drone.telemetry.health(), lambda h: h.is_armable, timeout_s)
+    print("Drone health OK. Ready to arm!")
@@ -0,0 +1,36 @@
+import os
+from typing import Optional
+
+
+def enable_rt(cpu: Optional[int] = None, nice: int = -10, fifo_priority: Optional[int] = None) -> None:
+    """
+    Best-effort scheduling setup for the mission process (Linux).
+
+    Parameters:
+        cpu           : pin to this core (ideally one isolated with isolcpus);
+                        None keeps the current affinity
+        nice          : niceness to request; lowering it needs CAP_SYS_NICE
+        fifo_priority : if set, switch to SCHED_FIFO at this priority
+                        (needs root; a runaway loop can then starve the core)
+
+    Call before the event loop starts: threads and subprocesses created
+    afterwards (gRPC, mavsdk_server, the CSV writer) inherit the settings.
+    Anything the platform or permissions do not allow is skipped.
+    """
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except (OSError, ValueError):
+            print(f"⚠️ Could not pin to CPU {cpu}")
+
+    if hasattr(os, "setpriority"):
+        try:
+            os.setpriority(os.PRIO_PROCESS, 0, nice)
+        except OSError:
+            pass
+
+    if fifo_priority is not None and hasattr(os, "sched_setscheduler"):
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(fifo_priority))
+        except OSError:
+            print("⚠️ SCHED_FIFO not permitted, keeping default scheduler")
@@ -2,14 +2,35 @@ import asyncio
 import math
 import time
 from typing import Callable, Tuple
+import numpy as np
 from mavsdk import System
 
 from .offboard_helpers import stop_offboard_and_land
-from ..utils.shared_state import SharedState
+from ..utils.shared_state import SharedState, POS_BIT, VEL_BIT, ATT_BIT
 
 
-def norm2(x: float, y: float) -> float:
-    return math.sqrt(x * x + y * y)
+def sampled_reference_xy(
+    trajectory,
+    duration_s: float,
+    rate_hz: float = 100.0,
+) -> Callable[[float], Tuple[float, float]]:
+    """
+    Pre-sample trajectory.position_xy_array over [0, duration_s] and return
+    a lookup usable as the watchdog's reference_xy.
+
+    Each tick then costs one list index instead of the trig evaluation;
+    the nearest-sample error is at most v_ref / (2 * rate_hz).
+    Times past the end hold the last sample.
+    """
+    t_grid = np.arange(int(duration_s * rate_hz) + 1) / rate_hz
+    x_ref, y_ref = trajectory.position_xy_array(t_grid)
+    table = list(zip(x_ref.tolist(), y_ref.tolist()))
+    last = len(table) - 1
+
+    def reference_xy(t: float) -> Tuple[float, float]:
+        return table[min(int(t * rate_hz + 0.5), last)]
+
+    return reference_xy
 
 
 async def safety_watchdog(
@@ -32,21 +53,25 @@ async def safety_watchdog(
       - roll/pitch limits
 
     IMPORTANT:
-      Uses the SAME time reference as the mission (t = time.time() - t0).
+      Uses the SAME time reference as the mission (t = time.monotonic() - t0).
+
+    Limits are compared on squared magnitudes; sqrt is only taken
+    for the emergency message.
     """
 
+    required = POS_BIT | VEL_BIT | ATT_BIT
+
+    drift_max_sq = drift_max_m * drift_max_m
+    speed_max_sq = speed_max_m_s * speed_max_m_s
+
     while state.running and not state.emergency_stop:
         await asyncio.sleep(0.1)
 
-        if (
-            state.pos_ned is None
-            or state.vel_ned is None
-            or state.attitude_deg is None
-        ):
+        if (state.valid_mask & required) != required:
             continue
 
         # ✅ Shared time reference with mission
-        t = time.time() - t0
+        t = time.monotonic() - t0
 
         # Timeout
         if t > nominal_duration_s * timeout_factor:
@@ -57,16 +82,20 @@ async def safety_watchdog(
         # Drift check (XY)
         x_ref, y_ref = reference_xy(t)
         x, y, _ = state.pos_ned
-        drift = norm2(x - x_ref, y - y_ref)
-        if drift > drift_max_m:
+        dx = x - x_ref
+        dy = y - y_ref
+        drift_sq = dx * dx + dy * dy
+        if drift_sq > drift_max_sq:
+            drift = math.sqrt(drift_sq)
             state.emergency_stop = True
             state.emergency_reason = f"DRIFT TOO HIGH: {drift:.2f} m"
             break
 
         # Speed check
         vx, vy, vz = state.vel_ned
-        speed = math.sqrt(vx * vx + vy * vy + vz * vz)
-        if speed > speed_max_m_s:
+        speed_sq = vx * vx + vy * vy + vz * vz
+        if speed_sq > speed_max_sq:
+            speed = math.sqrt(speed_sq)
             state.emergency_stop = True
             state.emergency_reason = f"SPEED TOO HIGH: {speed:.2f} m/s"
             break
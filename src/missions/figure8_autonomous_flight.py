@@ -20,17 +20,22 @@ import asyncio
 import time
 from contextlib import suppress
 
+import numpy as np
+
 from mavsdk.offboard import PositionNedYaw
 
 # ---- Core infrastructure ----
 from src.core.config import PX4Config
 from src.core.px4_connection import connect_px4, wait_armable
+from src.core.event_loop import run_mission
 from src.core.offboard_helpers import (
+    DeadlineTicker,
+    fly_setpoint_table,
     prestream_position_setpoints,
     start_offboard,
     stop_offboard_and_land,
 )
-from src.core.safety_watchdog import safety_watchdog
+from src.core.safety_watchdog import safety_watchdog, sampled_reference_xy
 
 # ---- Telemetry & state ----
 from src.utils.shared_state import SharedState
@@ -38,6 +43,7 @@ from src.utils.telemetry_watchers import (
     watch_posvel,
     watch_attitude,
     watch_flight_mode,
+    wait_for_position,
 )
 from src.utils.telemetry_logger import log_telemetry_csv
 
@@ -67,25 +73,13 @@ ENABLE_ALIGNMENT = True
 ALIGN_SECONDS = 3.0
 ALIGN_RATE_HZ = 20.0
 ALIGN_SETTLE_SECONDS = 0.5
+POSITION_TIMEOUT_S = 5.0  # give up on alignment if no position by then
 
 
 # ============================================================
 # Helpers
 # ============================================================
 
-async def cancel_and_await(tasks):
-    """Cancel tasks and await them to avoid warnings/unfinished coroutines."""
-    for t in tasks:
-        if t is None:
-            continue
-        t.cancel()
-    for t in tasks:
-        if t is None:
-            continue
-        with suppress(asyncio.CancelledError):
-            await t
-
-
 async def goto_xy_linear(
     drone,
     state: SharedState,
@@ -100,39 +94,40 @@ async def goto_xy_linear(
     Move linearly from current XY to target XY in given duration.
     Useful to align spatial phase before starting the reference trajectory clock.
     """
-    dt = 1.0 / rate_hz
-
     # Wait until we have a valid position
-    while state.pos_ned is None and state.running and not state.emergency_stop:
-        await asyncio.sleep(0.05)
-
-    if state.pos_ned is None:
+    if not await wait_for_position(state, POSITION_TIMEOUT_S):
         return
 
     x0, y0, _ = state.pos_ned
     steps = max(1, int(duration_s * rate_hz))
 
-    for i in range(steps):
+    # One setpoint object, mutated per tick (sent by value each call)
+    setpoint = PositionNedYaw(x0, y0, -altitude_m, DEFAULT_YAW_DEG)
+
+    ticker = DeadlineTicker(rate_hz)
+    set_position_ned = drone.offboard.set_position_ned  # hoisted out of the loop
+
+    # Per-step increments, accumulated instead of re-interpolating each tick
+    dx = (x_target - x0) / steps
+    dy = (y_target - y0) / steps
+
+    for _ in range(steps):
         if not state.running or state.emergency_stop:
             break
 
-        alpha = (i + 1) / steps
-        x_cmd = x0 + alpha * (x_target - x0)
-        y_cmd = y0 + alpha * (y_target - y0)
-
-        await drone.offboard.set_position_ned(
-            PositionNedYaw(x_cmd, y_cmd, -altitude_m, DEFAULT_YAW_DEG)
-        )
-        await asyncio.sleep(dt)
+        setpoint.north_m += dx
+        setpoint.east_m += dy
+        await set_position_ned(setpoint)
+        await ticker.wait()
 
     # Optional settle
     if settle_s > 0.0 and state.running and not state.emergency_stop:
-        t_end = time.time() + settle_s
-        while time.time() < t_end:
-            await drone.offboard.set_position_ned(
-                PositionNedYaw(x_target, y_target, -altitude_m, DEFAULT_YAW_DEG)
-            )
-            await asyncio.sleep(dt)
+        setpoint.north_m = x_target
+        setpoint.east_m = y_target
+        t_end = time.monotonic() + settle_s
+        while time.monotonic() < t_end:
+            await set_position_ned(setpoint)
+            await ticker.wait()
 
 
 # ============================================================
@@ -149,27 +144,17 @@ async def fly_trajectory(
     dt = 1.0 / rate_hz
     print("▶ Starting autonomous Figure-8 trajectory...")
 
-    while state.running and not state.emergency_stop:
-        t = time.time() - t0  # ✅ shared time base with watchdog
-
-        if t > trajectory.duration():
-            break
-
-        x, y = trajectory.position_xy(t)
-
-        yaw = trajectory.yaw_deg(t)
-
-        await drone.offboard.set_position_ned(
-            PositionNedYaw(
-                x,
-                y,
-                -ALTITUDE_M,
-                yaw
-            )
-        )
-
-        await asyncio.sleep(dt)
-
+    # Set-points on the tick grid t_i = i * dt, evaluated once up front
+    duration = trajectory.duration()
+    n = int(duration * rate_hz) + 1
+    ts = np.arange(n) * dt
+    xs, ys = trajectory.position_xy_array(ts)
+    table = [
+        (x, y, -ALTITUDE_M, yaw)
+        for x, y, yaw in zip(xs.tolist(), ys.tolist(), trajectory.yaw_deg_array(ts).tolist())
+    ]
+
+    await fly_setpoint_table(drone, state, table, duration, rate_hz, t0, "Figure-8 loop")
     print("✔ Trajectory execution finished.")
 
 
@@ -188,136 +173,140 @@ async def main():
     # Connect to PX4
     # --------------------------------------------------------
     drone = await connect_px4(cfg.system_address)
-    await wait_armable(drone)
-
-    # --------------------------------------------------------
-    # Arm & takeoff
-    # --------------------------------------------------------
-    await drone.action.set_takeoff_altitude(cfg.takeoff_alt_m)
-    await drone.action.arm()
-    print("✔ Armed")
-
-    await drone.action.takeoff()
-    print("▲ Taking off...")
-    await asyncio.sleep(5)
-
-    # --------------------------------------------------------
-    # Prepare Offboard mode
-    # --------------------------------------------------------
-    await prestream_position_setpoints(drone, down_m=-ALTITUDE_M, n=20)
-
-    print("Pre-streaming OFFBOARD setpoints...")
-
-    for _ in range(20):
-        await drone.offboard.set_position_ned(
-            PositionNedYaw(0.0, 0.0, -ALTITUDE_M, 0.0)
-        )
-        await asyncio.sleep(0.05)
-    
-    print("Starting Offboard...")
-    if not await start_offboard(drone):
-        print("Offboard start failed, aborting mission.")
-        return
 
     # --------------------------------------------------------
-    # Shared state & telemetry/watchers EARLY
+    # Shared state & telemetry watchers right after connect
+    # (subscriptions warm up during health wait + takeoff)
     # --------------------------------------------------------
     state = SharedState()
     state.running = True
     state.emergency_stop = False
 
-    task_posvel = asyncio.create_task(watch_posvel(drone, state))
-    task_att = asyncio.create_task(watch_attitude(drone, state))
-    task_mode = asyncio.create_task(watch_flight_mode(drone, state))
-    task_logger = asyncio.create_task(log_telemetry_csv(drone, state, LOG_FILENAME))
-
-    background_tasks = [task_posvel, task_att, task_mode]
-
-    # --------------------------------------------------------
-    # Trajectory
-    # --------------------------------------------------------
-    trajectory = Figure8Trajectory(radius=RADIUS_M, omega=OMEGA)
+    # Background tasks live in a TaskGroup: if one fails, the mission body
+    # is cancelled (the finally below still lands) and the error propagates
+    async with asyncio.TaskGroup() as tg:
+        task_posvel = tg.create_task(watch_posvel(drone, state))
+        task_att = tg.create_task(watch_attitude(drone, state))
+        task_mode = tg.create_task(watch_flight_mode(drone, state))
+
+        background_tasks = [task_posvel, task_att, task_mode]
+
+        await wait_armable(drone)
+
+        completed = False  # set only once the trajectory has run to its end
+        try:
+            # --------------------------------------------------------
+            # Arm & takeoff
+            # --------------------------------------------------------
+            await drone.action.set_takeoff_altitude(cfg.takeoff_alt_m)
+            await drone.action.arm()
+            print("✔ Armed")
+
+            await drone.action.takeoff()
+            print("▲ Taking off...")
+            await asyncio.sleep(5)
+
+            # --------------------------------------------------------
+            # Prepare Offboard mode
+            # --------------------------------------------------------
+            print("Pre-streaming OFFBOARD setpoints...")
+            await prestream_position_setpoints(drone, down_m=-ALTITUDE_M, n=20)
+
+            print("Starting Offboard...")
+            if not await start_offboard(drone):
+                print("Offboard start failed, aborting mission.")
+                return
+
+            # --------------------------------------------------------
+            # Telemetry logger
+            # --------------------------------------------------------
+            background_tasks.append(tg.create_task(log_telemetry_csv(drone, state, LOG_FILENAME)))
+
+            # --------------------------------------------------------
+            # Trajectory
+            # --------------------------------------------------------
+            trajectory = Figure8Trajectory(radius=RADIUS_M, omega=OMEGA)
+
+            # --------------------------------------------------------
+            # Optional: spatial alignment BEFORE t0
+            # --------------------------------------------------------
+            if ENABLE_ALIGNMENT:
+                # Align to the trajectory start point at t=0
+                # For your Figure8Trajectory, position_xy(0) is the start reference.
+                x_start, y_start = trajectory.position_xy(0.0)
+
+                print(
+                    f"[ALIGN] Going to Figure-8 start point: "
+                    f"x={x_start:.2f}, y={y_start:.2f} (duration={ALIGN_SECONDS:.1f}s)"
+                )
+                await goto_xy_linear(
+                    drone=drone,
+                    state=state,
+                    x_target=x_start,
+                    y_target=y_start,
+                    altitude_m=ALTITUDE_M,
+                    duration_s=ALIGN_SECONDS,
+                    rate_hz=ALIGN_RATE_HZ,
+                    settle_s=ALIGN_SETTLE_SECONDS,
+                )
+
+            # --------------------------------------------------------
+            # ✅ Shared mission start time AFTER alignment
+            # --------------------------------------------------------
+            t0 = time.monotonic()
+
+            # --------------------------------------------------------
+            # Safety watchdog (uses SAME t0) ✅
+            # NOTE: Your watchdog already lands on emergency.
+            # We still guarantee landing in finally for robustness.
+            # --------------------------------------------------------
+            task_safety = tg.create_task(
+                safety_watchdog(
+                    drone,
+                    state,
+                    reference_xy=sampled_reference_xy(trajectory, trajectory.duration()),
+                    nominal_duration_s=trajectory.duration(),
+                    t0=t0,  # ✅ shared reference
+                )
+            )
 
-    # --------------------------------------------------------
-    # Optional: spatial alignment BEFORE t0
-    # --------------------------------------------------------
-    if ENABLE_ALIGNMENT:
-        # Align to the trajectory start point at t=0
-        # For your Figure8Trajectory, position_xy(0) is the start reference.
-        x_start, y_start = trajectory.position_xy(0.0)
-
-        print(
-            f"[ALIGN] Going to Figure-8 start point: "
-            f"x={x_start:.2f}, y={y_start:.2f} (duration={ALIGN_SECONDS:.1f}s)"
-        )
-        await goto_xy_linear(
-            drone=drone,
-            state=state,
-            x_target=x_start,
-            y_target=y_start,
-            altitude_m=ALTITUDE_M,
-            duration_s=ALIGN_SECONDS,
-            rate_hz=ALIGN_RATE_HZ,
-            settle_s=ALIGN_SETTLE_SECONDS,
-        )
+            background_tasks.append(task_safety)
+
+            # --------------------------------------------------------
+            # Execute mission
+            # --------------------------------------------------------
+            await fly_trajectory(
+                drone=drone,
+                state=state,
+                trajectory=trajectory,
+                rate_hz=cfg.offboard_rate_hz,
+                t0=t0,
+            )
+            completed = True
 
-    # --------------------------------------------------------
-    # ✅ Shared mission start time AFTER alignment
-    # --------------------------------------------------------
-    t0 = time.time()
+        finally:
+            # ----------------------------------------------------
+            # Shutdown (always)
+            # ----------------------------------------------------
+            state.running = False
 
-    # --------------------------------------------------------
-    # Safety watchdog (uses SAME t0) ✅
-    # NOTE: Your watchdog already lands on emergency.
-    # We still guarantee landing in finally for robustness.
-    # --------------------------------------------------------
-    task_safety = asyncio.create_task(
-        safety_watchdog(
-            drone,
-            state,
-            reference_xy=lambda t: trajectory.position_xy(t),
-            nominal_duration_s=trajectory.duration(),
-            t0=t0,  # ✅ shared reference
-        )
-    )
+            # Cancel logger, watchers + safety; the TaskGroup awaits them
+            # on exit, and the logger still writes out its queued rows
+            for task in background_tasks:
+                task.cancel()
 
-    background_tasks.append(task_safety)
+            # ✅ Always stop offboard + land (even if emergency or exception)
+            with suppress(Exception):
+                await stop_offboard_and_land(drone)
 
-    # --------------------------------------------------------
-    # Execute mission
-    # --------------------------------------------------------
-    try:
-        await fly_trajectory(
-            drone=drone,
-            state=state,
-            trajectory=trajectory,
-            rate_hz=cfg.offboard_rate_hz,
-            t0=t0,
-        )
-
-    finally:
-        # ----------------------------------------------------
-        # Shutdown (always)
-        # ----------------------------------------------------
-        state.running = False
-
-        # Let logger finish
-        with suppress(Exception):
-            await task_logger
-
-        # Cancel watchers + safety cleanly
-        await cancel_and_await(background_tasks)
-
-        # ✅ Always stop offboard + land (even if emergency or exception)
-        with suppress(Exception):
-            await stop_offboard_and_land(drone)
-
-        if getattr(state, "emergency_stop", False):
-            reason = getattr(state, "emergency_reason", "UNKNOWN")
-            print(f"🏁 Mission ended (EMERGENCY) → {reason}")
-        else:
-            print("🏁 Autonomous Figure-8 mission completed.")
+            if getattr(state, "emergency_stop", False):
+                reason = getattr(state, "emergency_reason", "UNKNOWN")
+                print(f"🏁 Mission ended (EMERGENCY) → {reason}")
+            elif completed:
+                print("🏁 Autonomous Figure-8 mission completed.")
+            else:
+                print("🏁 Autonomous Figure-8 mission aborted.")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_mission(main)
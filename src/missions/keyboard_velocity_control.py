@@ -1,8 +1,12 @@
 import asyncio
+import atexit
 import curses
+import os
+import sys
 import time
 import math
 from pathlib import Path
+from collections import deque
 from dataclasses import dataclass
 from contextlib import suppress
 
@@ -10,13 +14,15 @@ from mavsdk.offboard import PositionNedYaw
 
 from src.core.config import PX4Config
 from src.core.px4_connection import connect_px4, wait_armable
-from src.core.offboard_helpers import start_offboard
+from src.core.event_loop import run_mission
+from src.core.offboard_helpers import DeadlineTicker, start_offboard
 
 from src.utils.shared_state import SharedState
 from src.utils.telemetry_watchers import (
     watch_posvel,
     watch_attitude,
     watch_flight_mode,
+    wait_for_position,
 )
 from src.utils.telemetry_logger import log_telemetry_csv
 
@@ -32,6 +38,10 @@ XY_LIMIT = 5.0
 OFFBOARD_RATE_HZ = 10
 DT = 0.1                  # control loop Hz = 10
 MISSION_DURATION = 20     
+SETPOINT_EPS = 1e-4       # m / deg: smaller target changes are not re-sent
+SETPOINT_KEEPALIVE_S = 0.4  # re-send an unchanged target at least this often
+KEY_QUEUE_LEN = 32        # pending keys kept between control ticks
+POSITION_TIMEOUT_S = 5.0  # abort (and land) if no position telemetry by then
 # ===================== PATHS =====================
 def repo_root() -> Path:
     return Path(__file__).resolve().parents[2]
@@ -46,10 +56,16 @@ def timestamped_csv():
     ts = time.strftime("%Y%m%d_%H%M%S")
     return f"keyboard_velocity_control_{ts}.csv"
 
+EVENT_LOG_PATH = repo_root() / "logs/telemetry/keyboard_velocity_events.txt"
+_event_fd = None
+
 def event_log(msg: str):
-    path = repo_root() / "logs/telemetry/keyboard_velocity_events.txt"
-    with open(path, "a") as f:
-        f.write(f"{time.time():.3f} {msg}\n")
+    """Append a timestamped event line with one unbuffered O_APPEND write."""
+    global _event_fd
+    if _event_fd is None:
+        _event_fd = os.open(EVENT_LOG_PATH, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        atexit.register(os.close, _event_fd)
+    os.write(_event_fd, f"{time.time():.3f} {msg}\n".encode())
 
 # ===================== UI STATE =====================
 @dataclass
@@ -65,53 +81,110 @@ class UIState:
     vy: float = 0.0
     mode: str = ""
     warning: str = ""
+    key_seq: int = 0  # bumped per key press, so repeats redraw too
 
 # ===================== KEYBOARD =====================
-def decode_key(k):
-    return {
-        curses.KEY_UP: "UP",
-        curses.KEY_DOWN: "DOWN",
-        curses.KEY_LEFT: "LEFT",
-        curses.KEY_RIGHT: "RIGHT",
-        ord("w"): "W",
-        ord("s"): "S",
-        ord("a"): "A",
-        ord("d"): "D",
-        ord(" "): "SPACE",
-        ord("q"): "Q",
-    }.get(k, str(k))
-
-def keyboard_ui(stdscr, q: asyncio.Queue, state: SharedState, ui: UIState):
-    curses.curs_set(0)
+# key code -> (display name, action, argument), built once
+KEY_TABLE = {
+    curses.KEY_UP: ("UP", "vx", SPEED_M_S),
+    curses.KEY_DOWN: ("DOWN", "vx", -SPEED_M_S),
+    curses.KEY_LEFT: ("LEFT", "vy", -SPEED_M_S),
+    curses.KEY_RIGHT: ("RIGHT", "vy", SPEED_M_S),
+    ord("w"): ("W", "alt", ALT_STEP_M),
+    ord("s"): ("S", "alt", -ALT_STEP_M),
+    ord("a"): ("A", "yaw", -YAW_RATE_DEG_S),
+    ord("d"): ("D", "yaw", YAW_RATE_DEG_S),
+    ord(" "): ("SPACE", "stop", None),
+    ord("q"): ("Q", "quit", None),
+}
+
+def open_screen():
+    """curses.wrapper()-equivalent setup, for use from the event loop."""
+    stdscr = curses.initscr()
+    curses.noecho()
+    curses.cbreak()
+    stdscr.keypad(True)
     stdscr.nodelay(True)
-    while state.running:
-        stdscr.erase()
-        stdscr.addstr(0, 0, "Keyboard BODY-frame Control (OFFBOARD)")
-        stdscr.addstr(2, 0, "↑ ↓ : forward / backward")
-        stdscr.addstr(3, 0, "← → : left / right")
-        stdscr.addstr(4, 0, "W/S : altitude up/down")
-        stdscr.addstr(5, 0, "A/D : yaw left/right")
-        stdscr.addstr(6, 0, "SPACE: stop  |  Q: quit")
-        stdscr.addstr(8, 0, f"STATUS: {ui.status}")
-        stdscr.addstr(9, 0, f"MODE  : {ui.mode}")
-        stdscr.addstr(10, 0, f"ALT   : {ui.alt:.2f} m   target {ui.alt_t:.2f}")
-        stdscr.addstr(11, 0, f"XY tgt: x={ui.x_t:.2f} y={ui.y_t:.2f}")
-        stdscr.addstr(12, 0, f"Yaw   : {ui.yaw:.1f} deg")
-        stdscr.addstr(13, 0, f"Cmd   : vx={ui.vx:.2f} vy={ui.vy:.2f}")
-        stdscr.addstr(14, 0, f"Key   : {ui.last_key}")
-        if ui.warning:
-            stdscr.addstr(16, 0, f"⚠ {ui.warning}")
-        stdscr.refresh()
+    with suppress(curses.error):
+        curses.curs_set(0)
+    return stdscr
+
+def close_screen(stdscr):
+    stdscr.keypad(False)
+    curses.nocbreak()
+    curses.echo()
+    curses.endwin()
+
+def read_keys(stdscr, q: deque):
+    """stdin reader callback: runs on the loop only when input arrives."""
+    while True:
         k = stdscr.getch()
-        if k != -1:
-            q.put_nowait(k)
-        time.sleep(0.05)
+        if k == -1:
+            break
+        q.append(k)
+
+UI_POLL_S = 0.05
+UI_REFRESH_S = 0.25
+
+def draw_help(stdscr):
+    stdscr.erase()
+    stdscr.addstr(0, 0, "Keyboard BODY-frame Control (OFFBOARD)")
+    stdscr.addstr(2, 0, "↑ ↓ : forward / backward")
+    stdscr.addstr(3, 0, "← → : left / right")
+    stdscr.addstr(4, 0, "W/S : altitude up/down")
+    stdscr.addstr(5, 0, "A/D : yaw left/right")
+    stdscr.addstr(6, 0, "SPACE: stop  |  Q: quit")
+
+def status_lines(ui: UIState):
+    lines = [
+        f"STATUS: {ui.status}",
+        f"MODE  : {ui.mode}",
+        f"ALT   : {ui.alt:.2f} m   target {ui.alt_t:.2f}",
+        f"XY tgt: x={ui.x_t:.2f} y={ui.y_t:.2f}",
+        f"Yaw   : {ui.yaw:.1f} deg",
+        f"Cmd   : vx={ui.vx:.2f} vy={ui.vy:.2f}",
+        f"Key   : {ui.last_key}",
+    ]
+    if ui.warning:
+        lines += ["", f"⚠ {ui.warning}"]
+    return lines
+
+def draw_status(stdscr, lines):
+    stdscr.move(8, 0)
+    stdscr.clrtobot()
+    for row, line in enumerate(lines, start=8):
+        stdscr.addstr(row, 0, line)
+    stdscr.noutrefresh()
+    curses.doupdate()
+
+async def keyboard_ui(stdscr, state: SharedState, ui: UIState):
+    """
+    Static help once; the status block is re-rendered on every key press or
+    every UI_REFRESH_S, and only written to the terminal if its text changed.
+    """
+    loop = asyncio.get_running_loop()
+    draw_help(stdscr)
+    drawn_seq = -1
+    drawn_lines = None
+    next_draw = 0.0
+    while state.running:
+        now = loop.time()
+        if ui.key_seq != drawn_seq or now >= next_draw:
+            lines = status_lines(ui)
+            if lines != drawn_lines:
+                draw_status(stdscr, lines)
+                drawn_lines = lines
+            drawn_seq = ui.key_seq
+            next_draw = now + UI_REFRESH_S
+        await asyncio.sleep(UI_POLL_S)
 
 # ===================== CONTROL LOOP =====================
-async def control_loop(drone, state: SharedState, ui: UIState, q: asyncio.Queue):
+async def control_loop(drone, state: SharedState, ui: UIState, q: deque):
     ui.status = "WAIT_TELEMETRY"
-    while state.pos_ned is None:
-        await asyncio.sleep(0.05)
+    if not await wait_for_position(state, POSITION_TIMEOUT_S):
+        ui.status = "NO_TELEMETRY"
+        event_log("NO_POSITION_TIMEOUT")
+        return
 
     x_t, y_t, d_t = state.pos_ned
     alt_t = -d_t
@@ -121,56 +194,86 @@ async def control_loop(drone, state: SharedState, ui: UIState, q: asyncio.Queue)
     vy_body = 0.0
     yaw_rate = 0.0
 
+    # cos/sin of trig_yaw, cached across ticks for the BODY → NED transform
+    trig_yaw = None
+    cos_yaw = sin_yaw = 0.0
+
+    # One setpoint object, mutated per tick (sent by value each call)
+    setpoint = PositionNedYaw(x_t, y_t, -alt_t, yaw_t)
+
     ui.status = "CONTROL_LIVE"
     event_log("CONTROL_START")
 
-    start_time = time.time()
+    # Deadline-paced on the monotonic clock; targets integrate over the
+    # measured tick interval, so a late tick does not lose motion
+    ticker = DeadlineTicker(1.0 / DT)
+    set_position_ned = drone.offboard.set_position_ned  # hoisted out of the loop
+    start_time = time.monotonic()
+    t_prev = start_time
+    t_sent = float("-inf")
+
+    while state.running:
+        now = time.monotonic()
+        if now - start_time >= MISSION_DURATION:
+            break
+        dt = now - t_prev
+        t_prev = now
 
-    while state.running and time.time() - start_time < MISSION_DURATION:
         ui.alt = -state.pos_ned[2]
-        ui.mode = getattr(state.flight_mode, "name", "")
+        ui.mode = state.flight_mode_name
         ui.yaw = yaw_t
-        ui.warning = ""
-
-        try:
-            k = q.get_nowait()
-            ui.last_key = decode_key(k)
-        except asyncio.QueueEmpty:
-            k = None
-
-        if k == curses.KEY_UP:
-            vx_body, vy_body = SPEED_M_S, 0.0
-        elif k == curses.KEY_DOWN:
-            vx_body, vy_body = -SPEED_M_S, 0.0
-        elif k == curses.KEY_RIGHT:
-            vx_body, vy_body = 0.0, SPEED_M_S
-        elif k == curses.KEY_LEFT:
-            vx_body, vy_body = 0.0, -SPEED_M_S
-        elif k == ord("w"):
-            alt_t += ALT_STEP_M
-        elif k == ord("s"):
-            alt_t -= ALT_STEP_M
-        elif k == ord("a"):
-            yaw_rate = -YAW_RATE_DEG_S
-        elif k == ord("d"):
-            yaw_rate = YAW_RATE_DEG_S
-        elif k == ord(" "):
-            vx_body = vy_body = yaw_rate = 0.0
-        elif k == ord("q"):
+        # Shown by the curses UI; printing here would corrupt the screen
+        ui.warning = f"{ticker.overruns} late control ticks" if ticker.overruns else ""
+
+        # Apply every key that arrived since the last tick, in order:
+        # altitude steps accumulate, the last key per axis wins
+        quit_requested = False
+        while q:
+            k = q.popleft()
+            ui.key_seq += 1
+            entry = KEY_TABLE.get(k)
+            if entry is None:
+                ui.last_key = str(k)
+                continue
+
+            ui.last_key, action, arg = entry
+            # Each axis latches independently: ↑ then → flies diagonally
+            if action == "vx":
+                vx_body = arg
+            elif action == "vy":
+                vy_body = arg
+            elif action == "alt":
+                alt_t += arg
+            elif action == "yaw":
+                yaw_rate = arg
+            elif action == "stop":
+                vx_body = vy_body = yaw_rate = 0.0
+            elif action == "quit":
+                quit_requested = True
+                break
+
+        if quit_requested:
             state.running = False
             break
 
         # altitude clamp
         alt_t = max(ALT_MIN_M, min(ALT_MAX_M, alt_t))
 
-        # BODY → NED transform
-        yaw_rad = math.radians(yaw_t)
-        v_n = math.cos(yaw_rad) * vx_body - math.sin(yaw_rad) * vy_body
-        v_e = math.sin(yaw_rad) * vx_body + math.cos(yaw_rad) * vy_body
+        # BODY → NED transform; skipped while holding (no command)
+        if vx_body or vy_body:
+            if yaw_t != trig_yaw:  # recompute only when the heading moved
+                yaw_rad = math.radians(yaw_t)
+                cos_yaw = math.cos(yaw_rad)
+                sin_yaw = math.sin(yaw_rad)
+                trig_yaw = yaw_t
+            v_n = cos_yaw * vx_body - sin_yaw * vy_body
+            v_e = sin_yaw * vx_body + cos_yaw * vy_body
+
+            x_t += v_n * dt
+            y_t += v_e * dt
 
-        x_t += v_n * DT
-        y_t += v_e * DT
-        yaw_t += yaw_rate * DT
+        if yaw_rate:
+            yaw_t += yaw_rate * dt
 
         # XY clamp
         x_t = max(-XY_LIMIT, min(XY_LIMIT, x_t))
@@ -180,11 +283,23 @@ async def control_loop(drone, state: SharedState, ui: UIState, q: asyncio.Queue)
         ui.alt_t = alt_t
         ui.vx, ui.vy = vx_body, vy_body
 
-        await drone.offboard.set_position_ned(
-            PositionNedYaw(x_t, y_t, -alt_t, yaw_t)
+        # While hovering the target does not change: send it only as a
+        # keepalive (PX4 needs > 2 Hz to stay in offboard)
+        moved = (
+            abs(x_t - setpoint.north_m) > SETPOINT_EPS
+            or abs(y_t - setpoint.east_m) > SETPOINT_EPS
+            or abs(-alt_t - setpoint.down_m) > SETPOINT_EPS
+            or abs(yaw_t - setpoint.yaw_deg) > SETPOINT_EPS
         )
+        if moved or now - t_sent >= SETPOINT_KEEPALIVE_S:
+            setpoint.north_m = x_t
+            setpoint.east_m = y_t
+            setpoint.down_m = -alt_t
+            setpoint.yaw_deg = yaw_t
+            await set_position_ned(setpoint)
+            t_sent = now
 
-        await asyncio.sleep(DT)
+        await ticker.wait()
 
     event_log("CONTROL_END")
     state.running = False  # Force end if timer finished
@@ -201,50 +316,82 @@ async def main():
     )
 
     drone = await connect_px4(cfg.system_address)
-    await wait_armable(drone)
-
-    await drone.action.arm()
-    await drone.action.set_takeoff_altitude(TAKEOFF_ALT_M)
-    await drone.action.takeoff()
-    await asyncio.sleep(5)
 
+    # Telemetry watchers start right away so they warm up during
+    # the health wait and takeoff
     state = SharedState()
     state.running = True
 
-    ui = UIState()
-
-    t_pos = asyncio.create_task(watch_posvel(drone, state))
-    t_att = asyncio.create_task(watch_attitude(drone, state))
-    t_mode = asyncio.create_task(watch_flight_mode(drone, state))
-    t_log = asyncio.create_task(log_telemetry_csv(drone, state, csv_name))
-
-    while state.pos_ned is None:
-        await asyncio.sleep(0.1)
+    # A failing background task cancels the control loop (the finally
+    # below still lands); tasks still running on exit are awaited
+    async with asyncio.TaskGroup() as tg:
+        background_tasks = [
+            tg.create_task(watch_posvel(drone, state)),
+            tg.create_task(watch_attitude(drone, state)),
+            tg.create_task(watch_flight_mode(drone, state)),
+        ]
 
-    for _ in range(20):
-        x, y, d = state.pos_ned
-        yaw = state.attitude_deg[2]
-        await drone.offboard.set_position_ned(PositionNedYaw(x, y, d, yaw))
-        await asyncio.sleep(0.05)
+        await wait_armable(drone)
 
-    await start_offboard(drone)
+        loop = asyncio.get_running_loop()
+        stdin_fd = sys.stdin.fileno()
+        stdscr = None
 
-    q = asyncio.Queue()
-    loop = asyncio.get_running_loop()
-    ui_task = loop.run_in_executor(None, curses.wrapper,
-                                   lambda s: keyboard_ui(s, q, state, ui))
-
-    try:
-        await control_loop(drone, state, ui, q)
-    finally:
-        state.running = False
-        await drone.offboard.stop()
-        await drone.action.land()
-
-        for t in (t_pos, t_att, t_mode, t_log):
-            t.cancel()
-            with suppress(asyncio.CancelledError):
-                await t
+        try:
+            await drone.action.arm()
+            await drone.action.set_takeoff_altitude(TAKEOFF_ALT_M)
+            await drone.action.takeoff()
+            await asyncio.sleep(5)
+
+            ui = UIState()
+
+            background_tasks.append(tg.create_task(log_telemetry_csv(drone, state, csv_name)))
+
+            if not await wait_for_position(state, POSITION_TIMEOUT_S):
+                print("No position telemetry, aborting mission.")
+                return
+
+            # Prime offboard on a fixed 20 Hz deadline: 20 sends take 1 s
+            # regardless of per-send latency
+            setpoint = PositionNedYaw(0.0, 0.0, 0.0, 0.0)
+            ticker = DeadlineTicker(20.0)
+            for _ in range(20):
+                setpoint.north_m, setpoint.east_m, setpoint.down_m = state.pos_ned
+                setpoint.yaw_deg = state.attitude_deg[2]
+                await drone.offboard.set_position_ned(setpoint)
+                await ticker.wait()
+
+            await start_offboard(drone)
+
+            # Keys are read on the event loop as soon as stdin is readable
+            # (no polling thread); the UI redraw is a plain task on the same loop.
+            # Reader and control loop share the loop thread, so a bounded deque
+            # is enough to pass keys (a burst drops the oldest)
+            q = deque(maxlen=KEY_QUEUE_LEN)
+
+            stdscr = open_screen()
+            loop.add_reader(stdin_fd, read_keys, stdscr, q)
+            background_tasks.append(tg.create_task(keyboard_ui(stdscr, state, ui)))
+
+            await control_loop(drone, state, ui, q)
+        finally:
+            state.running = False
+            if stdscr is not None:
+                loop.remove_reader(stdin_fd)
+                close_screen(stdscr)
+
+            # Screen is closed by now, so failures can be printed
+            try:
+                await drone.offboard.stop()
+            except Exception as e:
+                print(f"⚠️ Offboard stop failed: {e}")
+            try:
+                await drone.action.land()
+            except Exception as e:
+                print(f"⚠️ Land failed: {e}")
+
+            for t in background_tasks:
+                t.cancel()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_mission(main)
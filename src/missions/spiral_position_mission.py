@@ -6,7 +6,7 @@ Fixes included:
 2) ✅ Spatial alignment BEFORE t0 (go to spiral start point) -> prevents initial ~R drift
 3) ✅ Correct NED "down" usage for altitude (start_z/end_z consistent with takeoff altitude)
 4) ✅ Robust shutdown: always stop offboard + land, cancel tasks cleanly
-5) ✅ Optional yaw alignment with path (finite diff on trajectory)
+5) ✅ Optional yaw alignment with path (analytic tangent of the trajectory)
 6) ✅ Mission markers in CSV (mission_phase + mission_t0_unix) for precise drift/time alignment
 
 Notes:
@@ -16,25 +16,30 @@ Notes:
 
 import asyncio
 import time
-import math
 from contextlib import suppress
 
+import numpy as np
+
 from mavsdk.offboard import PositionNedYaw
 
 from src.core.config import PX4Config
 from src.core.px4_connection import connect_px4, wait_armable
+from src.core.event_loop import run_mission
 from src.core.offboard_helpers import (
+    DeadlineTicker,
+    fly_setpoint_table,
     prestream_position_setpoints,
     start_offboard,
     stop_offboard_and_land,
 )
-from src.core.safety_watchdog import safety_watchdog
+from src.core.safety_watchdog import safety_watchdog, sampled_reference_xy
 
 from src.utils.shared_state import SharedState
 from src.utils.telemetry_watchers import (
     watch_posvel,
     watch_attitude,
     watch_flight_mode,
+    wait_for_position,
 )
 from src.utils.telemetry_logger import log_telemetry_csv
 
@@ -59,6 +64,7 @@ ENABLE_ALIGNMENT = True
 ALIGN_SECONDS = 3.0
 ALIGN_RATE_HZ = 20.0
 ALIGN_SETTLE_SECONDS = 0.5
+POSITION_TIMEOUT_S = 5.0  # give up on alignment if no position by then
 
 # Yaw behavior
 ENABLE_YAW_FROM_PATH = True
@@ -69,33 +75,6 @@ DEFAULT_YAW_DEG = 0.0
 # Helpers
 # ============================================================
 
-async def cancel_and_await(tasks):
-    """Cancel tasks and await them to avoid warnings/unfinished coroutines."""
-    for t in tasks:
-        if t is None:
-            continue
-        t.cancel()
-    for t in tasks:
-        if t is None:
-            continue
-        with suppress(asyncio.CancelledError):
-            await t
-
-
-def yaw_from_spiral(trajectory: SpiralTrajectory, t: float, eps: float = 0.05) -> float:
-    """Compute yaw (deg) aligned with trajectory velocity (finite difference)."""
-    x1, y1, _ = trajectory.position_xyz(t)
-    x2, y2, _ = trajectory.position_xyz(t + eps)
-
-    vx = (x2 - x1) / eps
-    vy = (y2 - y1) / eps
-
-    if abs(vx) < 1e-6 and abs(vy) < 1e-6:
-        return DEFAULT_YAW_DEG
-
-    return math.degrees(math.atan2(vy, vx))
-
-
 async def goto_xyz_linear(
     drone,
     state: SharedState,
@@ -111,38 +90,44 @@ async def goto_xyz_linear(
     Linearly move from current NED to target NED in duration_s.
     Useful for alignment BEFORE starting the reference trajectory clock.
     """
-    dt = 1.0 / rate_hz
-
     # Wait for valid position
-    while state.pos_ned is None and state.running and not state.emergency_stop:
-        await asyncio.sleep(0.05)
-
-    if state.pos_ned is None:
+    if not await wait_for_position(state, POSITION_TIMEOUT_S):
         return
 
     x0, y0, z0 = state.pos_ned
     steps = max(1, int(duration_s * rate_hz))
 
-    for i in range(steps):
+    # One setpoint object, mutated per tick (sent by value each call)
+    setpoint = PositionNedYaw(x0, y0, z0, yaw_deg)
+
+    ticker = DeadlineTicker(rate_hz)
+    set_position_ned = drone.offboard.set_position_ned  # hoisted out of the loop
+
+    # Per-step increments, accumulated instead of re-interpolating each tick
+    dx = (x_target - x0) / steps
+    dy = (y_target - y0) / steps
+    dz = (z_target - z0) / steps
+
+    for _ in range(steps):
         if not state.running or state.emergency_stop:
             break
 
-        a = (i + 1) / steps
-        x = x0 + a * (x_target - x0)
-        y = y0 + a * (y_target - y0)
-        z = z0 + a * (z_target - z0)
+        setpoint.north_m += dx
+        setpoint.east_m += dy
+        setpoint.down_m += dz
 
-        await drone.offboard.set_position_ned(PositionNedYaw(x, y, z, yaw_deg))
-        await asyncio.sleep(dt)
+        await set_position_ned(setpoint)
+        await ticker.wait()
 
     # Optional settle hold
     if settle_s > 0.0 and state.running and not state.emergency_stop:
-        t_end = time.time() + settle_s
-        while time.time() < t_end:
-            await drone.offboard.set_position_ned(
-                PositionNedYaw(x_target, y_target, z_target, yaw_deg)
-            )
-            await asyncio.sleep(dt)
+        setpoint.north_m = x_target
+        setpoint.east_m = y_target
+        setpoint.down_m = z_target
+        t_end = time.monotonic() + settle_s
+        while time.monotonic() < t_end:
+            await set_position_ned(setpoint)
+            await ticker.wait()
 
 
 # ============================================================
@@ -159,22 +144,19 @@ async def fly_spiral(
     dt = 1.0 / rate_hz
     print("▶ Starting Spiral trajectory...")
 
-    while state.running and not state.emergency_stop:
-        t = time.time() - t0  # ✅ shared time base with watchdog
-
-        if t > trajectory.duration():
-            break
-
-        x, y, z = trajectory.position_xyz(t)
-
-        if ENABLE_YAW_FROM_PATH:
-            yaw = yaw_from_spiral(trajectory, t)
-        else:
-            yaw = DEFAULT_YAW_DEG
-
-        await drone.offboard.set_position_ned(PositionNedYaw(x, y, z, yaw))
-        await asyncio.sleep(dt)
-
+    # Set-points on the tick grid t_i = i * dt, position and yaw evaluated
+    # together in one vectorized pass up front
+    duration = trajectory.duration()
+    n = int(duration * rate_hz) + 1
+    ts = np.arange(n) * dt
+    xs, ys, zs = trajectory.position_xyz_array(ts)
+    if ENABLE_YAW_FROM_PATH:
+        yaws = trajectory.yaw_deg_array(ts)
+    else:
+        yaws = np.full(n, DEFAULT_YAW_DEG)
+    table = list(zip(xs.tolist(), ys.tolist(), zs.tolist(), yaws.tolist()))
+
+    await fly_setpoint_table(drone, state, table, duration, rate_hz, t0, "Spiral loop")
     print("✔ Spiral trajectory finished.")
 
 
@@ -193,147 +175,152 @@ async def main():
     # Connect to PX4
     # --------------------------------------------------------
     drone = await connect_px4(cfg.system_address)
-    await wait_armable(drone)
 
     # --------------------------------------------------------
-    # Arm & takeoff
+    # Shared state + telemetry watchers right after connect
+    # (subscriptions warm up during health wait + takeoff)
     # --------------------------------------------------------
-    await drone.action.set_takeoff_altitude(cfg.takeoff_alt_m)
-    await drone.action.arm()
-    print("✔ Armed")
-
-    await drone.action.takeoff()
-    print("▲ Taking off...")
-    await asyncio.sleep(5)
-
-    # --------------------------------------------------------
-    # Build trajectory (correct NED down)
-    # Start at -ALTITUDE_M, end at -(ALTITUDE_M + CLIMB_M)
-    # --------------------------------------------------------
-    trajectory = SpiralTrajectory(
-        radius=RADIUS_M,
-        start_z=-ALTITUDE_M,
-        end_z=-(ALTITUDE_M + CLIMB_M),
-        omega=OMEGA,
-    )
-
-    # --------------------------------------------------------
-    # Offboard prep (prestream)
-    # --------------------------------------------------------
-    # ✅ marker
     state = SharedState()
-    state.mission_phase = "OFFBOARD_PREP"
-
-    await prestream_position_setpoints(drone, down_m=trajectory.z0, n=20)
-
-    # Optional extra local prestream burst
-    for _ in range(20):
-        await drone.offboard.set_position_ned(
-            PositionNedYaw(0.0, 0.0, trajectory.z0, 0.0)
-        )
-        await asyncio.sleep(0.05)
-
-    print("Starting Offboard...")
-    if not await start_offboard(drone):
-        print("Offboard start failed, aborting mission.")
-        return
-
-    # --------------------------------------------------------
-    # Shared state + watchers + logger (start EARLY)
-    # --------------------------------------------------------
-    state.running = True
-    state.emergency_stop = False
-    state.mission_phase = "OFFBOARD"
-
-    task_posvel = asyncio.create_task(watch_posvel(drone, state))
-    task_att = asyncio.create_task(watch_attitude(drone, state))
-    task_mode = asyncio.create_task(watch_flight_mode(drone, state))
-    task_logger = asyncio.create_task(log_telemetry_csv(drone, state, LOG_FILE))
-
-    background_tasks = [task_posvel, task_att, task_mode]
-
-    # --------------------------------------------------------
-    # Alignment BEFORE starting reference clock
-    # --------------------------------------------------------
-    if ENABLE_ALIGNMENT:
-        state.mission_phase = "ALIGNMENT"
-
-        x_start, y_start, z_start = trajectory.position_xyz(0.0)
-
-        print(
-            f"[ALIGN] Going to Spiral start point: "
-            f"x={x_start:.2f}, y={y_start:.2f}, z(down)={z_start:.2f} "
-            f"(duration={ALIGN_SECONDS:.1f}s)"
-        )
-
-        await goto_xyz_linear(
-            drone=drone,
-            state=state,
-            x_target=x_start,
-            y_target=y_start,
-            z_target=z_start,
-            duration_s=ALIGN_SECONDS,
-            rate_hz=ALIGN_RATE_HZ,
-            yaw_deg=DEFAULT_YAW_DEG,
-            settle_s=ALIGN_SETTLE_SECONDS,
-        )
-
-    # --------------------------------------------------------
-    # ✅ Trajectory start marker (ground truth)
-    # --------------------------------------------------------
-    state.mission_phase = "TRAJECTORY"
-    t0 = time.time()
-    state.mission_t0_unix = t0  # ✅ saved into CSV
 
-    # --------------------------------------------------------
-    # Safety watchdog (uses SAME t0)
-    # --------------------------------------------------------
-    task_safety = asyncio.create_task(
-        safety_watchdog(
-            drone,
-            state,
-            reference_xy=lambda t: trajectory.position_xyz(t)[:2],
-            nominal_duration_s=trajectory.duration(),
-            t0=t0,
-        )
-    )
-    background_tasks.append(task_safety)
-
-    # --------------------------------------------------------
-    # Execute mission + robust shutdown
-    # --------------------------------------------------------
-    try:
-        await fly_spiral(
-            drone=drone,
-            state=state,
-            trajectory=trajectory,
-            rate_hz=cfg.offboard_rate_hz,
-            t0=t0,
-        )
+    # Background tasks live in a TaskGroup: if one fails, the mission body
+    # is cancelled (the finally below still lands) and the error propagates
+    async with asyncio.TaskGroup() as tg:
+        task_posvel = tg.create_task(watch_posvel(drone, state))
+        task_att = tg.create_task(watch_attitude(drone, state))
+        task_mode = tg.create_task(watch_flight_mode(drone, state))
+
+        background_tasks = [task_posvel, task_att, task_mode]
+
+        await wait_armable(drone)
+
+        completed = False  # set only once the trajectory has run to its end
+        try:
+            # --------------------------------------------------------
+            # Arm & takeoff
+            # --------------------------------------------------------
+            await drone.action.set_takeoff_altitude(cfg.takeoff_alt_m)
+            await drone.action.arm()
+            print("✔ Armed")
+
+            await drone.action.takeoff()
+            print("▲ Taking off...")
+            await asyncio.sleep(5)
+
+            # --------------------------------------------------------
+            # Build trajectory (correct NED down)
+            # Start at -ALTITUDE_M, end at -(ALTITUDE_M + CLIMB_M)
+            # --------------------------------------------------------
+            trajectory = SpiralTrajectory(
+                radius=RADIUS_M,
+                start_z=-ALTITUDE_M,
+                end_z=-(ALTITUDE_M + CLIMB_M),
+                omega=OMEGA,
+            )
 
-    finally:
-        state.mission_phase = "LANDING"
-        state.running = False
+            # --------------------------------------------------------
+            # Offboard prep (prestream)
+            # --------------------------------------------------------
+            # ✅ marker
+            state.mission_phase = "OFFBOARD_PREP"
+
+            await prestream_position_setpoints(drone, down_m=trajectory.z0, n=20)
+
+            print("Starting Offboard...")
+            if not await start_offboard(drone):
+                print("Offboard start failed, aborting mission.")
+                return
+
+            # --------------------------------------------------------
+            # Logger (start EARLY)
+            # --------------------------------------------------------
+            state.running = True
+            state.emergency_stop = False
+            state.mission_phase = "OFFBOARD"
+
+            background_tasks.append(tg.create_task(log_telemetry_csv(drone, state, LOG_FILE)))
+
+            # --------------------------------------------------------
+            # Alignment BEFORE starting reference clock
+            # --------------------------------------------------------
+            if ENABLE_ALIGNMENT:
+                state.mission_phase = "ALIGNMENT"
+
+                x_start, y_start, z_start = trajectory.position_xyz(0.0)
+
+                print(
+                    f"[ALIGN] Going to Spiral start point: "
+                    f"x={x_start:.2f}, y={y_start:.2f}, z(down)={z_start:.2f} "
+                    f"(duration={ALIGN_SECONDS:.1f}s)"
+                )
+
+                await goto_xyz_linear(
+                    drone=drone,
+                    state=state,
+                    x_target=x_start,
+                    y_target=y_start,
+                    z_target=z_start,
+                    duration_s=ALIGN_SECONDS,
+                    rate_hz=ALIGN_RATE_HZ,
+                    yaw_deg=DEFAULT_YAW_DEG,
+                    settle_s=ALIGN_SETTLE_SECONDS,
+                )
+
+            # --------------------------------------------------------
+            # ✅ Trajectory start marker (ground truth)
+            # --------------------------------------------------------
+            state.mission_phase = "TRAJECTORY"
+            t0 = time.monotonic()
+            state.mission_t0_unix = time.time()  # ✅ saved into CSV (wall clock, matches unix_time)
+
+            # --------------------------------------------------------
+            # Safety watchdog (uses SAME t0)
+            # --------------------------------------------------------
+            task_safety = tg.create_task(
+                safety_watchdog(
+                    drone,
+                    state,
+                    reference_xy=sampled_reference_xy(trajectory, trajectory.duration()),
+                    nominal_duration_s=trajectory.duration(),
+                    t0=t0,
+                )
+            )
+            background_tasks.append(task_safety)
+
+            # --------------------------------------------------------
+            # Execute mission + robust shutdown
+            # --------------------------------------------------------
+            await fly_spiral(
+                drone=drone,
+                state=state,
+                trajectory=trajectory,
+                rate_hz=cfg.offboard_rate_hz,
+                t0=t0,
+            )
+            completed = True
 
-        # Let logger finish
-        with suppress(Exception):
-            await task_logger
+        finally:
+            state.mission_phase = "LANDING"
+            state.running = False
 
-        # Cancel watchers + safety
-        await cancel_and_await(background_tasks)
+            # Cancel logger, watchers + safety; the TaskGroup awaits them
+            # on exit, and the logger still writes out its queued rows
+            for task in background_tasks:
+                task.cancel()
 
-        # Always stop offboard + land
-        with suppress(Exception):
-            await stop_offboard_and_land(drone)
+            # Always stop offboard + land
+            with suppress(Exception):
+                await stop_offboard_and_land(drone)
 
-        state.mission_phase = "DONE"
+            state.mission_phase = "DONE"
 
-        if getattr(state, "emergency_stop", False):
-            reason = getattr(state, "emergency_reason", "UNKNOWN")
-            print(f"🏁 Spiral mission ended (EMERGENCY) → {reason}")
-        else:
-            print("🏁 Spiral mission completed.")
+            if getattr(state, "emergency_stop", False):
+                reason = getattr(state, "emergency_reason", "UNKNOWN")
+                print(f"🏁 Spiral mission ended (EMERGENCY) → {reason}")
+            elif completed:
+                print("🏁 Spiral mission completed.")
+            else:
+                print("🏁 Spiral mission aborted.")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_mission(main)
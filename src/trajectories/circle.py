@@ -8,8 +8,13 @@ No PX4 / MAVSDK code here.
 import math
 from typing import Tuple
 
+import numpy as np
+
 
 class CircleTrajectory:
+    # Fixed attribute set: no per-instance __dict__
+    __slots__ = ("R", "cx", "cy", "w")
+
     def __init__(
         self,
         radius: float = 3.0,
@@ -29,8 +34,19 @@ class CircleTrajectory:
         x(t) = cx + R * cos(w t)
         y(t) = cy + R * sin(w t)
         """
-        x = self.cx + self.R * math.cos(self.w * t)
-        y = self.cy + self.R * math.sin(self.w * t)
+        phase = self.w * t
+        x = self.cx + self.R * math.cos(phase)
+        y = self.cy + self.R * math.sin(phase)
+        return x, y
+
+    def position_xy_array(self, t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized position_xy() for an array of times.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        phase = self.w * t
+        x = self.cx + self.R * np.cos(phase)
+        y = self.cy + self.R * np.sin(phase)
         return x, y
 
     def duration(self) -> float:
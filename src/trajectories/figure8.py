@@ -10,8 +10,13 @@ No PX4 / MAVSDK code here.
 import math
 from typing import Tuple
 
+import numpy as np
+
 
 class Figure8Trajectory:
+    # Fixed attribute set: no per-instance __dict__
+    __slots__ = ("R", "cx", "cy", "w")
+
     def __init__(
         self,
         radius: float = 3.0,
@@ -31,8 +36,19 @@ class Figure8Trajectory:
         x = R * sin(w t)
         y = 0.5 R * sin(2 w t)
         """
-        x = self.cx + self.R * math.sin(self.w * t)
-        y = self.cy + 0.5 * self.R * math.sin(2 * self.w * t)
+        phase = self.w * t
+        x = self.cx + self.R * math.sin(phase)
+        y = self.cy + 0.5 * self.R * math.sin(2 * phase)
+        return x, y
+
+    def position_xy_array(self, t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized position_xy() for an array of times.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        phase = self.w * t
+        x = self.cx + self.R * np.sin(phase)
+        y = self.cy + 0.5 * self.R * np.sin(2 * phase)
         return x, y
 
     def duration(self) -> float:
@@ -46,8 +62,9 @@ class Figure8Trajectory:
         Heading (yaw) aligned with trajectory velocity.
         Returned in degrees (NED frame).
         """
-        vx = self.R * self.w * math.cos(self.w * t)
-        vy = self.R * self.w * math.cos(2 * self.w * t)
+        phase = self.w * t
+        vx = self.R * self.w * math.cos(phase)
+        vy = self.R * self.w * math.cos(2 * phase)
     
         if abs(vx) < 1e-6 and abs(vy) < 1e-6:
             return 0.0
@@ -55,3 +72,15 @@ class Figure8Trajectory:
         yaw_rad = math.atan2(vy, vx)
         return math.degrees(yaw_rad)
 
+    def yaw_deg_array(self, t: np.ndarray) -> np.ndarray:
+        """
+        Vectorized yaw_deg() for an array of times.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        phase = self.w * t
+        vx = self.R * self.w * np.cos(phase)
+        vy = self.R * self.w * np.cos(2 * phase)
+
+        yaw = np.degrees(np.arctan2(vy, vx))
+        return np.where((np.abs(vx) < 1e-6) & (np.abs(vy) < 1e-6), 0.0, yaw)
+
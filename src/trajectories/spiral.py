@@ -11,8 +11,13 @@ monotonic change in altitude over time (3D path).
 import math
 from typing import Tuple
 
+import numpy as np
+
 
 class SpiralTrajectory:
+    # Fixed attribute set: no per-instance __dict__
+    __slots__ = ("R", "cx", "cy", "z0", "zf", "w", "_dz", "_duration")
+
     def __init__(
         self,
         radius: float = 3.0,
@@ -38,6 +43,10 @@ class SpiralTrajectory:
         self.zf = end_z
         self.w = omega
 
+        # Invariants of position_xyz(), fixed at construction
+        self._dz = end_z - start_z
+        self._duration = 2 * math.pi / omega
+
     def position_xyz(self, t: float) -> Tuple[float, float, float]:
         """
         Compute 3D reference position at time t.
@@ -46,16 +55,64 @@ class SpiralTrajectory:
         y(t) = cy + R * sin(w t)
         z(t) = linear interpolation from start_z to end_z
         """
-        x = self.cx + self.R * math.cos(self.w * t)
-        y = self.cy + self.R * math.sin(self.w * t)
+        phase = self.w * t
+        x = self.cx + self.R * math.cos(phase)
+        y = self.cy + self.R * math.sin(phase)
 
         # Linear altitude change over one full spiral
-        z = self.z0 + (self.zf - self.z0) * (t / self.duration())
+        z = self.z0 + self._dz * (t / self._duration)
+
+        return x, y, z
 
+    def position_xy_array(self, t: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized horizontal (XY) component of position_xyz().
+        """
+        t = np.asarray(t, dtype=np.float64)
+        phase = self.w * t
+        x = self.cx + self.R * np.cos(phase)
+        y = self.cy + self.R * np.sin(phase)
+        return x, y
+
+    def position_xyz_array(
+        self, t: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized position_xyz() for an array of times.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        x, y = self.position_xy_array(t)
+        z = self.z0 + self._dz * (t / self._duration)
         return x, y, z
 
     def duration(self) -> float:
         """
         Nominal duration for one full spiral revolution.
         """
-        return 2 * math.pi / self.w
+        return self._duration
+
+    def yaw_deg(self, t: float) -> float:
+        """
+        Heading (yaw) aligned with the horizontal trajectory velocity.
+        Returned in degrees (NED frame).
+        """
+        phase = self.w * t
+        vx = -self.R * self.w * math.sin(phase)
+        vy = self.R * self.w * math.cos(phase)
+
+        if abs(vx) < 1e-6 and abs(vy) < 1e-6:
+            return 0.0
+
+        return math.degrees(math.atan2(vy, vx))
+
+    def yaw_deg_array(self, t: np.ndarray) -> np.ndarray:
+        """
+        Vectorized yaw_deg() for an array of times.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        phase = self.w * t
+        vx = -self.R * self.w * np.sin(phase)
+        vy = self.R * self.w * np.cos(phase)
+
+        yaw = np.degrees(np.arctan2(vy, vx))
+        return np.where((np.abs(vx) < 1e-6) & (np.abs(vy) < 1e-6), 0.0, yaw)
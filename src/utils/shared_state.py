@@ -1,13 +1,23 @@
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
 from typing import Optional, Tuple, Any
 
-@dataclass
+# SharedState.valid_mask bits: set once the matching snapshot has arrived
+POS_BIT = 1 << 0
+VEL_BIT = 1 << 1
+ATT_BIT = 1 << 2
+
+
+@dataclass(slots=True)  # fixed attribute set: slot access, no per-instance __dict__
 class SharedState:
     # Latest telemetry snapshots
     pos_ned: Optional[Tuple[float, float, float]] = None   # (north, east, down)
     vel_ned: Optional[Tuple[float, float, float]] = None   # (vn, ve, vd)
     attitude_deg: Optional[Tuple[float, float, float]] = None  # (roll, pitch, yaw)
     flight_mode: Optional[Any] = None
+    flight_mode_name: str = ""  # display/log form of flight_mode, set by the watcher
+    valid_mask: int = 0  # OR of *_BIT flags for the snapshots above
+    pos_ready: asyncio.Event = field(default_factory=asyncio.Event)  # set on first pos_ned
 
     # Control flags
     running: bool = True
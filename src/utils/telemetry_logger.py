@@ -1,10 +1,97 @@
-import csv
+import asyncio
+import queue
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
 from mavsdk import System
 from .shared_state import SharedState
 
 
+# Samples are handed to a dedicated writer thread; it flushes the file at
+# least every FLUSH_INTERVAL_S so a crash loses at most one interval
+FLUSH_INTERVAL_S = 0.5
+FILE_BUFFER_BYTES = 1 << 20
+
+CSV_HEADER = [
+    "t",  # seconds since logger start
+    "unix_time",  # absolute unix time for each sample
+    "north_m", "east_m", "down_m",
+    "vn_m_s", "ve_m_s", "vd_m_s",
+    "roll_deg", "pitch_deg", "yaw_deg",
+    "flight_mode",
+    # ✅ markers
+    "mission_phase",
+    "mission_t0_unix",
+]
+
+_STOP = object()  # writer thread shutdown sentinel
+
+# One printf-style template per row; only the str fields can need quoting
+_ROW_TEMPLATE = "%.3f,%.6f,%.3f,%.3f,%.3f,%.3f,%.3f,%.3f,%s,%s,%s,%s,%s,%s\n"
+
+
+@lru_cache(maxsize=None)
+def _csv_field(s: str) -> str:
+    # Mode and phase names come from a small fixed set, so this is cached
+    if any(c in s for c in ',"\r\n'):
+        return '"' + s.replace('"', '""') + '"'
+    return s
+
+
+def _format_row(now, unix_now, pos, vel, att, mode_name, phase, mission_t0_unix):
+    roll = pitch = yaw = ""
+    if att is not None:
+        roll, pitch, yaw = att
+
+    return _ROW_TEMPLATE % (
+        now,
+        unix_now,
+        pos[0], pos[1], pos[2],
+        vel[0], vel[1], vel[2],
+        roll, pitch, yaw,
+        _csv_field(mode_name),
+        # ✅ markers
+        _csv_field(phase),
+        "" if mission_t0_unix is None else "%.6f" % mission_t0_unix,
+    )
+
+
+def _csv_writer(samples: "queue.SimpleQueue", log_path: Path) -> None:
+    """
+    Writer thread: drain queued samples, format and write them in batches.
+    Exits after writing everything queued before the _STOP sentinel.
+    """
+    # Binary file: each batch is joined and encoded once, skipping the
+    # per-write work of a text-mode wrapper
+    with open(log_path, "wb", buffering=FILE_BUFFER_BYTES) as f:
+        f.write((",".join(CSV_HEADER) + "\n").encode())
+
+        last_flush = time.monotonic()
+        stop = False
+
+        while not stop:
+            batch = []
+            try:
+                item = samples.get(timeout=FLUSH_INTERVAL_S)
+                while True:
+                    if item is _STOP:
+                        stop = True
+                        break
+                    batch.append(_format_row(*item))
+                    item = samples.get_nowait()
+            except queue.Empty:
+                pass
+
+            if batch:
+                f.write("".join(batch).encode())
+
+            now = time.monotonic()
+            if stop or now - last_flush >= FLUSH_INTERVAL_S:
+                f.flush()
+                last_flush = now
+
+
 async def log_telemetry_csv(
     drone: System,
     state: SharedState,
@@ -16,6 +103,17 @@ async def log_telemetry_csv(
     CSV now includes mission markers:
     - mission_phase
     - mission_t0_unix (absolute timestamp of trajectory start)
+
+    This coroutine only snapshots SharedState; opening, formatting and
+    writing the file happen on a dedicated thread, so disk stalls never
+    block the event loop. On exit (including cancellation) the queued
+    samples are written out before the coroutine returns.
+
+    A row is only written when the snapshot differs from the previous
+    one, so a stalled telemetry stream shows up as a gap in `t` instead
+    of repeated stale rows. The log is therefore sampled at most every
+    0.1 s, not on a uniform grid: analysis must work from `t` /
+    `unix_time`, never from row counts.
     """
 
     # Resolve repo root and logs directory
@@ -26,56 +124,42 @@ async def log_telemetry_csv(
     log_path = logs_dir / filename
     print(f"Telemetry logger started → {log_path}")
 
-    with open(log_path, "w", newline="") as f:
-        writer = csv.writer(f)
-
-        writer.writerow([
-            "t",  # seconds since logger start
-            "unix_time",  # absolute unix time for each sample
-            "north_m", "east_m", "down_m",
-            "vn_m_s", "ve_m_s", "vd_m_s",
-            "roll_deg", "pitch_deg", "yaw_deg",
-            "flight_mode",
-            # ✅ markers
-            "mission_phase",
-            "mission_t0_unix",
-        ])
+    samples = queue.SimpleQueue()
+    writer_thread = threading.Thread(
+        target=_csv_writer,
+        args=(samples, log_path),
+        name="telemetry-csv-writer",
+        daemon=True,
+    )
+    writer_thread.start()
 
-        t0_logger = time.time()
+    t0_logger = time.time()
+    last_snapshot = None
 
+    try:
         while state.running:
             unix_now = time.time()
             now = unix_now - t0_logger
 
             pos = state.pos_ned
             vel = state.vel_ned
-            att = state.attitude_deg
-            mode = state.flight_mode
 
             if pos is not None and vel is not None:
-                roll = pitch = yaw = ""
-                if att is not None:
-                    roll, pitch, yaw = att
-
-                mode_str = ""
-                if mode is not None:
-                    mode_str = getattr(mode, "name", str(mode))
-
-                writer.writerow([
-                    f"{now:.3f}",
-                    f"{unix_now:.6f}",
-                    f"{pos[0]:.3f}", f"{pos[1]:.3f}", f"{pos[2]:.3f}",
-                    f"{vel[0]:.3f}", f"{vel[1]:.3f}", f"{vel[2]:.3f}",
-                    f"{roll}", f"{pitch}", f"{yaw}",
-                    mode_str,
-                    # ✅ markers
+                # Skipped when equal to the last row (element-wise float compare):
+                # rows are not evenly spaced, readers must use t / unix_time
+                snapshot = (
+                    pos,
+                    vel,
+                    state.attitude_deg,
+                    state.flight_mode_name,
                     state.mission_phase,
-                    "" if state.mission_t0_unix is None else f"{state.mission_t0_unix:.6f}",
-                ])
-
-            await _sleep(0.1)
-
-
-async def _sleep(sec: float):
-    import asyncio
-    await asyncio.sleep(sec)
+                    state.mission_t0_unix,
+                )
+                if snapshot != last_snapshot:
+                    samples.put((now, unix_now) + snapshot)
+                    last_snapshot = snapshot
+
+            await asyncio.sleep(0.1)
+    finally:
+        samples.put(_STOP)
+        await asyncio.to_thread(writer_thread.join)
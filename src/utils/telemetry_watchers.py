@@ -1,5 +1,8 @@
+import asyncio
+from typing import Optional
+
 from mavsdk import System
-from .shared_state import SharedState
+from .shared_state import SharedState, POS_BIT, VEL_BIT, ATT_BIT
 
 async def watch_posvel(drone: System, state: SharedState):
     async for data in drone.telemetry.position_velocity_ned():
@@ -7,6 +10,8 @@ async def watch_posvel(drone: System, state: SharedState):
         vel = data.velocity
         state.pos_ned = (pos.north_m, pos.east_m, pos.down_m)
         state.vel_ned = (vel.north_m_s, vel.east_m_s, vel.down_m_s)
+        state.valid_mask |= POS_BIT | VEL_BIT
+        state.pos_ready.set()
 
         if not state.running:
             break
@@ -14,11 +19,24 @@ async def watch_posvel(drone: System, state: SharedState):
 async def watch_attitude(drone: System, state: SharedState):
     async for att in drone.telemetry.attitude_euler():
         state.attitude_deg = (att.roll_deg, att.pitch_deg, att.yaw_deg)
+        state.valid_mask |= ATT_BIT
         if not state.running:
             break
 
 async def watch_flight_mode(drone: System, state: SharedState):
     async for mode in drone.telemetry.flight_mode():
         state.flight_mode = mode
+        state.flight_mode_name = getattr(mode, "name", str(mode))
         if not state.running:
             break
+
+async def wait_for_position(state: SharedState, timeout_s: Optional[float] = None) -> bool:
+    """
+    Wait (without polling) until watch_posvel has delivered a position.
+    Returns False if none arrived within timeout_s.
+    """
+    try:
+        await asyncio.wait_for(state.pos_ready.wait(), timeout_s)
+    except asyncio.TimeoutError:
+        return False
+    return True